@@ -1,15 +1,17 @@
 import tkinter as tk
 from tkinter import messagebox
 
+import calc_engine
+
 class Calculator:
     def __init__(self, master):
         self.master = master
         master.title("Simple Calculator")
-        master.geometry("300x400") # Set initial window size
+        master.geometry("300x440") # Set initial window size
         master.resizable(False, False) # Prevent resizing for simplicity
 
         # Configure grid weights to make cells expand proportionally
-        for i in range(5): # 5 rows for buttons
+        for i in range(2, 7): # 5 rows for buttons, below the display and preview
             master.grid_rowconfigure(i, weight=1)
         for i in range(4): # 4 columns for buttons
             master.grid_columnconfigure(i, weight=1)
@@ -20,6 +22,16 @@ class Calculator:
         self.entry.grid(row=0, column=0, columnspan=4, pady=10, padx=10, sticky="nsew")
         self.entry.insert(0, "") # Initialize with empty string
 
+        # --- Live Preview ---
+        # The evaluator is fed only the characters appended since the last
+        # update, so the running result never requires re-parsing the display.
+        self.live = calc_engine.IncrementalEvaluator()
+        self._clicked = False
+        self._shown_text = ""
+        self.preview = tk.StringVar()
+        tk.Label(master, textvariable=self.preview, font=('Arial', 14), fg='gray', anchor='e').grid(row=1, column=0, columnspan=4, padx=10, sticky="nsew")
+        self.equation.trace_add("write", self.sync_preview)
+
         # --- Buttons ---
         buttons = [
             '7', '8', '9', '/',
@@ -27,7 +39,7 @@ class Calculator:
             '1', '2', '3', '-',
             '0', '.', '=', '+'
         ]
-        row_val = 1
+        row_val = 2
         col_val = 0
 
         for button_text in buttons:
@@ -53,8 +65,32 @@ class Calculator:
 
     def button_click(self, char):
         """Appends the clicked character to the display."""
-        current_text = self.equation.get()
-        self.equation.set(current_text + str(char))
+        self.live.feed(str(char))
+        self._clicked = True
+        self.entry.insert(tk.END, str(char))
+
+    def sync_preview(self, *args):
+        """Keeps the live evaluator in step with the display and shows its running result."""
+        text = self.equation.get()
+        if self._clicked:
+            # Already fed by button_click
+            self._clicked = False
+        elif len(text) >= self.live.length and text.startswith(self._shown_text):
+            # Typed or pasted at the end: feed only the new characters
+            self.live.feed(text[self.live.length:])
+        else:
+            # Edited in the middle, cleared or replaced by a result: start over
+            self.live.reset()
+            self.live.feed(text)
+        self._shown_text = text
+
+        try:
+            value = self.live.preview()
+            self.preview.set("" if value is None else "= " + calc_engine.format_result(value))
+        except ZeroDivisionError:
+            self.preview.set(calc_engine.DIVIDE_BY_ZERO_MESSAGE)
+        except SyntaxError:
+            self.preview.set("")
 
     def clear_expression(self):
         """Clears the display."""
@@ -65,15 +101,20 @@ class Calculator:
         try:
             # Get the expression from the entry widget
             expression = self.equation.get()
-            # Evaluate the expression
-            result = str(eval(expression))
+            # Use the live parse state when it matches the display, otherwise
+            # fall back to the cached, compiled engine
+            if len(expression) == self.live.length:
+                value = self.live.result()
+            else:
+                value = calc_engine.evaluate(expression)
+            result = calc_engine.format_result(value)
             # Set the result back to the entry widget
             self.equation.set(result)
         except ZeroDivisionError:
-            messagebox.showerror("Error", "Cannot divide by zero!")
+            messagebox.showerror("Error", calc_engine.DIVIDE_BY_ZERO_MESSAGE)
             self.equation.set("")
         except SyntaxError:
-            messagebox.showerror("Error", "Invalid expression!")
+            messagebox.showerror("Error", calc_engine.INVALID_EXPRESSION_MESSAGE)
             self.equation.set("")
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {e}")
@@ -3,6 +3,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from house_predict import save_model
 
 # 🏠 Step 2: Input data (Area,NO.of Bedrooms,NO. of Washrooms)
 X = np.array([
@@ -20,6 +21,9 @@ y = np.array([300, 400, 500, 250, 550])
 model = LinearRegression()
 model.fit(X, y)  # model learns the best values from data
 
+# 💾 Save the fitted model so house_predict.py can score files without refitting
+save_model("house_model.npz", model.coef_, model.intercept_)
+
 # 📈 Step 5: Predict prices using the same data
 y_pred = model.predict(X)
 
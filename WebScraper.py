@@ -1,8 +1,27 @@
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+import argparse
+import atexit
+import sys
+from contextlib import nullcontext
 from datetime import datetime
+from scraper_cache import ResponseCache
+from scraper_fetch import describe_error, fetch_rows, print_metrics
+from scraper_metrics import Metrics
+from scraper_store import QuoteStore
 
+# Optional per-stage timings: --metrics, --metrics-json PATH, --profile PATH
+parser = argparse.ArgumentParser(description="Scrape stock quotes and email the report.")
+parser.add_argument("--metrics", action="store_true", help="print per-stage latency percentiles")
+parser.add_argument("--metrics-json", metavar="PATH", help="also write them as JSON")
+parser.add_argument("--profile", metavar="PATH", help="dump a cProfile of the hottest stage")
+parser.add_argument("--no-report", action="store_true",
+                    help="only store the quotes; skip the Excel report and email")
+args = parser.parse_args()
+metrics = None
+if args.metrics or args.metrics_json or args.profile:
+    metrics = Metrics(profile=bool(args.profile))
+    atexit.register(print_metrics, metrics, args.metrics_json, args.profile)
+
+# One-shot report; for polling through market hours, run scraper_daemon.py
 # List of stock symbols (you can add more)
 stocks = {
     "TCS": "TCS.NS",
@@ -10,40 +29,35 @@ stocks = {
     "Infosys": "INFY.NS"
 }
 
-data = []
-
-for name, symbol in stocks.items():
-    url = f"https://finance.yahoo.com/quote/{symbol}"
-    headers = {"User-Agent": "Mozilla/5.0"}
-
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    try:
-        price = soup.find("fin-streamer", {"data-field": "regularMarketPrice"}).text
-        change = soup.find("fin-streamer", {"data-field": "regularMarketChangePercent"}).text
+# Fetch all quote pages concurrently over pooled keep-alive connections;
+# pages from the last minute are reused and older ones revalidated
+data, failures = fetch_rows(stocks, cache=ResponseCache(".quote_cache", ttl=60), metrics=metrics)
+for name, e in failures.items():
+    print(f"Failed to fetch data for {name}: {describe_error(e)}")
 
-        data.append({
-            "Company": name,
-            "Symbol": symbol,
-            "Price (INR)": price,
-            "Change (%)": change,
-        })
+# Keep the report in the same order as the stocks above
+order = {name: i for i, name in enumerate(stocks)}
+data.sort(key=lambda row: order[row["Company"]])
 
-    except Exception as e:
-        print(f"Failed to fetch data for {name}: {e}")
+# Append this run to the quote history (see scraper_store.py for queries)
+store = QuoteStore("quotes.db")
+with metrics.timed("store") if metrics else nullcontext():
+    run = store.append(data)
+print(f"Stored {len(data)} quotes in quotes.db")
 
-# Convert to DataFrame
-df = pd.DataFrame(data)
+# The Excel report is only needed as the email attachment
+if args.no_report:
+    sys.exit()
 
-# Save to Excel
-filename = f"stock_report_{datetime.now().strftime('%Y-%m-%d_%H-%M')}.xlsx"
-df.to_excel(filename, index=False)
+# Export exactly the rows this run appended from the store to Excel
+filename = f"stock_report_{datetime.fromtimestamp(run.ts).strftime('%Y-%m-%d_%H-%M')}.xlsx"
+with metrics.timed("dataframe") if metrics else nullcontext():
+    df = store.frame(run=run)
+with metrics.timed("to_excel") if metrics else nullcontext():
+    df.to_excel(filename, index=False)
 
 print(f"Stock report saved as {filename}")
-import smtplib
-from email.message import EmailMessage
-import os
+from scraper_mail import Outbox, SMTPDelivery, report_message
 
 # Email config
 sender_email = "sender email"
@@ -53,24 +67,24 @@ password = "enter your password"
 # File to attach
 attachment_path = filename  # from previous part
 
-# Create the email
-msg = EmailMessage()
-msg["Subject"] = "📈 Daily Stock Market Report"
-msg["From"] = sender_email
-msg["To"] = receiver_email
-msg.set_content("Hi,\n\nAttached is your daily stock market report generated by Python automation.\n\n- Sent via Bot 😎")
+# Create the email (large attachments are gzip-compressed)
+msg = report_message(
+    sender_email, receiver_email, attachment_path,
+    "📈 Daily Stock Market Report",
+    "Hi,\n\nAttached is your daily stock market report generated by Python automation.\n\n- Sent via Bot 😎")
 
-# Read and attach Excel file
-with open(attachment_path, "rb") as f:
-    file_data = f.read()
-    file_name = os.path.basename(attachment_path)
-    msg.add_attachment(file_data, maintype="application", subtype="vnd.openxmlformats-officedocument.spreadsheetml.sheet", filename=file_name)
+# Queue the email in outbox.db; anything that cannot be sent now is retried
+# with backoff, and whatever is still queued at exit goes out on the next run
+delivery = SMTPDelivery(Outbox("outbox.db"), "smtp.gmail.com", 465, sender_email, password,
+                        max_attempts=3, backoff=2.0, metrics=metrics).start()
+message_id = delivery.submit(msg)
+delivery.stop(drain=True, timeout=30)
 
-# Send the email
-try:
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-        smtp.login(sender_email, password)
-        smtp.send_message(msg)
-        print("✅ Email sent successfully!")
-except Exception as e:
-    print("❌ Failed to send email:", e)
+# Report on this run's email only (the outbox may hold older ones too)
+status, error = delivery.outbox.status(message_id)
+if status == "sent":
+    print("✅ Email sent successfully!")
+elif status == "queued":
+    print("⏳ Email queued; it will be retried on the next run" + (f" ({error})" if error else ""))
+else:
+    print("❌ Failed to send email:", error)
@@ -1,10 +1,22 @@
+import queue
 import tkinter as tk
 from tkinter import filedialog, messagebox
-import pyttsx3
-from pypdf import PdfReader
+from audiobook_cache import TextCache
+from audiobook_index import IndexBuilder, PageIndex
+from audiobook_pipeline import PlaybackPipeline
 
-# Initialize TTS engine
-engine = pyttsx3.init()
+# Extracted page text is cached on disk, so pages are only parsed once
+text_cache = TextCache()
+
+# Words of every page are indexed in the background, next to the text cache
+# (a book's index is dropped when the cache evicts it)
+page_index = PageIndex(cache=text_cache)
+
+# Current playback (extraction and speech run on background threads)
+pipeline = None
+indexer = None
+hits = []
+search_query = None
 
 def browse_pdf():
     file_path = filedialog.askopenfilename(
@@ -13,37 +25,128 @@ def browse_pdf():
     )
     if file_path:
         pdf_path_var.set(file_path)
+        index_pdf(file_path)
+
+def index_pdf(file_path):
+    # Index the pages not indexed yet on a background thread, which also
+    # answers searches; search works on the pages done so far
+    global indexer
+    if indexer is not None:
+        if indexer.path == file_path and indexer.running:  # restarted after an error
+            return indexer
+        indexer.stop()
+    indexer = IndexBuilder(file_path, page_index, text_cache).start()
+    return indexer
+
+def search_pdf(event=None):
+    global hits, search_query
+    query = search_entry.get().strip()
+    if not query or not pdf_path_var.get():
+        return
+    search_query = query
+    hits = []
+    hit_list.delete(0, tk.END)
+    hit_list.insert(tk.END, "Searching...")
+    index_pdf(pdf_path_var.get()).search(query)
 
-def read_pdf():
+def show_hits(query, results):
+    global hits
+    if query != search_query:
+        return  # an older search finished after a newer one was started
+    hits = results
+    hit_list.delete(0, tk.END)
+    for hit in hits:
+        hit_list.insert(tk.END, f"p. {hit.page}: {hit.snippet}")
+    if not hits:
+        hit_list.insert(tk.END, "No matches")
+
+def open_hit(event=None):
+    # Start reading at the sentence of the chosen hit
+    selection = hit_list.curselection()
+    if selection and selection[0] < len(hits):
+        hit = hits[selection[0]]
+        read_pdf(sentence=hit.sentence, page_num=hit.page)
+
+def read_pdf(sentence=0, page_num=None):
+    global pipeline
     file_path = pdf_path_var.get()
     try:
-        page_num = int(page_entry.get())
-        reader = PdfReader(file_path)
-        if page_num < 0 or page_num >= len(reader.pages):
-            messagebox.showerror("Error", f"Page number out of range (0 - {len(reader.pages) - 1})")
-            return
-        page = reader.pages[page_num]
-        text = page.extract_text()
-        if not text:
-            messagebox.showinfo("No Text", "No text found on this page.")
-            return
-
-        # Set speech speed from slider
-        speed = speed_scale.get()
-        engine.setProperty('rate', speed)
-
-        engine.say(text)
-        engine.runAndWait()
+        if page_num is None:
+            page_num = int(page_entry.get())
+
+        stop_reading()
+        last_page = None if continuous_var.get() else page_num
+        # The PDF is opened (hashed, counted and range-checked) on the extractor thread;
+        # speech speed comes from the slider (and follows it sentence by sentence)
+        pipeline = PlaybackPipeline(file_path, page_num, last_page, speed=speed_scale.get(),
+                                    after=pipeline, sentence=sentence, bookmarks=text_cache,
+                                    cache=text_cache).start()
+        status_var.set("Opening PDF...")
     except Exception as e:
         messagebox.showerror("Error", str(e))
 
+def resume_pdf():
+    # Continue from the sentence where this PDF was last stopped
+    bookmark = text_cache.bookmark(pdf_path_var.get()) if pdf_path_var.get() else None
+    if bookmark is None:
+        messagebox.showinfo("No Bookmark", "This PDF has not been read yet.")
+        return
+    read_pdf(sentence=bookmark[1], page_num=bookmark[0])
+
+def stop_reading():
+    if pipeline is not None:
+        pipeline.stop()
+
+def set_speed(value):
+    if pipeline is not None:
+        pipeline.set_speed(int(value))
+
+def poll_events():
+    # Only progress events reach the Tk thread
+    if pipeline is not None:
+        try:
+            while True:
+                event = pipeline.events.get_nowait()
+                if event[0] == "opened":
+                    status_var.set(f"Preparing page {pipeline.first} of {event[1] - 1}...")
+                elif event[0] == "page":
+                    status_var.set(f"🔊 Reading page {event[1]} of {event[2]}")
+                    page_entry.delete(0, tk.END)
+                    page_entry.insert(0, str(event[1]))
+                elif event[0] == "first_audio":
+                    print(f"Time to first audio: {event[1]:.3f}s")
+                    first_audio_var.set(f"⏱️ First audio after {event[1]:.2f}s")
+                elif event[0] == "error":
+                    messagebox.showerror("Error", event[1])
+                elif event[0] == "done":
+                    status_var.set("Stopped")
+        except queue.Empty:
+            pass
+    if indexer is not None:
+        try:
+            while True:
+                event = indexer.events.get_nowait()
+                if event[0] == "indexed":
+                    index_var.set(f"🔎 Indexed {event[1]} of {event[2]} pages")
+                elif event[0] == "hits":
+                    show_hits(event[1], event[2])
+                elif event[0] == "error":
+                    index_var.set(f"Indexing failed: {event[1]}")
+        except queue.Empty:
+            pass
+    root.after(100, poll_events)
+
 # GUI setup
 root = tk.Tk()
 root.title("PDF Audiobook Reader")
-root.geometry("400x320")
+root.geometry("400x600")
 root.resizable(False, False)
 
 pdf_path_var = tk.StringVar()
+continuous_var = tk.BooleanVar(value=True)
+status_var = tk.StringVar(value="Ready")
+first_audio_var = tk.StringVar()
+index_var = tk.StringVar()
 
 tk.Label(root, text="Select a PDF file:").pack(pady=5)
 tk.Entry(root, textvariable=pdf_path_var, width=40).pack(pady=5)
@@ -52,15 +155,37 @@ tk.Button(root, text="Browse", command=browse_pdf).pack(pady=5)
 tk.Label(root, text="Enter Page Number:").pack(pady=5)
 page_entry = tk.Entry(root)
 page_entry.pack(pady=5)
+tk.Checkbutton(root, text="Keep reading the following pages", variable=continuous_var).pack()
 
 # 🔊 Add Speech Speed Control
 tk.Label(root, text="Speech Speed:").pack(pady=5)
-speed_scale = tk.Scale(root, from_=100, to=300, orient=tk.HORIZONTAL)
+speed_scale = tk.Scale(root, from_=100, to=300, orient=tk.HORIZONTAL, command=set_speed)
 speed_scale.set(175)  # Default speed
 speed_scale.pack(pady=5)
 
-tk.Button(root, text="Read Aloud", command=read_pdf, bg="green", fg="white").pack(pady=15)
+buttons = tk.Frame(root)
+buttons.pack(pady=10)
+tk.Button(buttons, text="Read Aloud", command=read_pdf, bg="green", fg="white").pack(side=tk.LEFT, padx=5)
+tk.Button(buttons, text="Resume", command=resume_pdf).pack(side=tk.LEFT, padx=5)
+tk.Button(buttons, text="Stop", command=stop_reading, bg="red", fg="white").pack(side=tk.LEFT, padx=5)
+
+tk.Label(root, textvariable=status_var).pack()
+tk.Label(root, textvariable=first_audio_var, font=("Arial", 8)).pack()
+
+# 🔎 Jump to a phrase
+search_frame = tk.Frame(root)
+search_frame.pack(pady=5)
+search_entry = tk.Entry(search_frame, width=30)
+search_entry.pack(side=tk.LEFT, padx=5)
+search_entry.bind("<Return>", search_pdf)
+tk.Button(search_frame, text="Search", command=search_pdf).pack(side=tk.LEFT)
+hit_list = tk.Listbox(root, width=60, height=6)
+hit_list.pack(padx=10)
+hit_list.bind("<Double-Button-1>", open_hit)
+hit_list.bind("<Return>", open_hit)
+tk.Label(root, textvariable=index_var, font=("Arial", 8)).pack()
 
 tk.Label(root, text="Created with ❤️ using Python", font=("Arial", 8)).pack(side=tk.BOTTOM, pady=5)
 
+poll_events()
 root.mainloop()
@@ -0,0 +1,179 @@
+"""Persistent cache of text extracted from PDFs.
+
+Page text is stored zlib-compressed in SQLite, keyed by (SHA-256 of the
+file's content, page number), so a page is extracted once however often it
+is read, and renaming or copying a book keeps its cache. Editing a book
+changes its hash, which invalidates the old entries; to avoid hashing the
+whole file on every open, the hash is remembered per (path, size, mtime).
+
+The page count is cached with the book, so a book that has been opened
+before needs no PDF parsing at all until a page that was never extracted
+is read. Whole books are evicted, least recently used first, once the
+cache grows past ``max_bytes``; callables in ``on_evict`` are then called
+with each evicted digest, so data derived from a book (its search index)
+goes with it.
+
+Reading positions (page, sentence) are bookmarked here too, per path.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "audiobook")
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS books (
+    digest TEXT PRIMARY KEY,
+    page_count INTEGER,
+    last_used REAL NOT NULL,
+    bytes INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS bookmarks (
+    path TEXT PRIMARY KEY,
+    page INTEGER NOT NULL,
+    sentence INTEGER NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    digest TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    text BLOB NOT NULL,
+    PRIMARY KEY (digest, page)
+);
+"""
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TextCache:
+    """Thread-safe on-disk cache of extracted page text."""
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.on_evict = []
+        self.db = sqlite3.connect(os.path.join(directory, "text.db"), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def digest(self, path):
+        """Content hash of ``path``, recomputed only when its size or mtime changes."""
+        path = os.path.abspath(path)
+        info = os.stat(path)
+        with self._lock:
+            row = self.db.execute("SELECT size, mtime_ns, digest FROM files WHERE path = ?",
+                                  (path,)).fetchone()
+        if row and row[:2] == (info.st_size, info.st_mtime_ns):
+            return row[2]
+        digest = file_digest(path)
+        with self._lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                            (path, info.st_size, info.st_mtime_ns, digest))
+        return digest
+
+    def open_book(self, digest):
+        """Marks a book as used; returns its cached page count (None if unknown)."""
+        with self._lock, self.db:
+            self.db.execute("INSERT OR IGNORE INTO books (digest, last_used) VALUES (?, ?)",
+                            (digest, time.time()))
+            self.db.execute("UPDATE books SET last_used = ? WHERE digest = ?", (time.time(), digest))
+            return self.db.execute("SELECT page_count FROM books WHERE digest = ?",
+                                   (digest,)).fetchone()[0]
+
+    def set_page_count(self, digest, page_count):
+        with self._lock, self.db:
+            self.db.execute("UPDATE books SET page_count = ? WHERE digest = ?", (page_count, digest))
+
+    def get(self, digest, page):
+        """Cached text of a page, or None."""
+        with self._lock:
+            row = self.db.execute("SELECT text FROM pages WHERE digest = ? AND page = ?",
+                                  (digest, page)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, digest, page, text):
+        blob = zlib.compress(text.encode("utf-8"), 6)
+        with self._lock, self.db:
+            replaced = self.db.execute("SELECT LENGTH(text) FROM pages WHERE digest = ? AND page = ?",
+                                       (digest, page)).fetchone()
+            self.db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?)", (digest, page, blob))
+            self.db.execute("UPDATE books SET bytes = bytes + ? WHERE digest = ?",
+                            (len(blob) - (replaced[0] if replaced else 0), digest))
+
+    def save_bookmark(self, path, page, sentence):
+        """Remembers where reading of ``path`` stopped."""
+        with self._lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO bookmarks VALUES (?, ?, ?, ?)",
+                            (os.path.abspath(path), page, sentence, time.time()))
+
+    def bookmark(self, path):
+        """Returns (page, sentence) where reading of ``path`` stopped, or None."""
+        with self._lock:
+            return self.db.execute("SELECT page, sentence FROM bookmarks WHERE path = ?",
+                                   (os.path.abspath(path),)).fetchone()
+
+    def digests(self):
+        """The digests of every cached book."""
+        with self._lock:
+            return {digest for digest, in self.db.execute("SELECT digest FROM books")}
+
+    def evict(self, keep=None):
+        """Drops least recently used books until the cache fits its budget.
+
+        ``keep`` (a digest) is never evicted. Returns the number of books removed.
+        """
+        removed = []
+        with self._lock, self.db:
+            total = self.db.execute("SELECT COALESCE(SUM(bytes), 0) FROM books").fetchone()[0]
+            for digest, size in self.db.execute(
+                    "SELECT digest, bytes FROM books ORDER BY last_used").fetchall():
+                if total <= self.max_bytes:
+                    break
+                if digest == keep:
+                    continue
+                self.db.execute("DELETE FROM pages WHERE digest = ?", (digest,))
+                self.db.execute("DELETE FROM books WHERE digest = ?", (digest,))
+                self.db.execute("DELETE FROM files WHERE digest = ?", (digest,))
+                total -= size
+                removed.append(digest)
+        for digest in removed:
+            for callback in self.on_evict:
+                callback(digest)
+        return len(removed)
+
+    def stats(self):
+        with self._lock:
+            books, pages, size = self.db.execute(
+                "SELECT COUNT(*), (SELECT COUNT(*) FROM pages), COALESCE(SUM(bytes), 0) FROM books"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {"books": books, "pages": pages, "bytes": size, "hits": self.hits,
+                "misses": self.misses, "hit_ratio": self.hits / lookups if lookups else 0.0}
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,227 @@
+"""Headless PDF-to-audio export across a process pool.
+
+Splits a PDF into page ranges (or top-level outline chapters), and each
+worker process synthesizes its ranges to separate audio files with its own
+pyttsx3 engine (``save_to_file``). The parts are listed in an ``.m3u``
+playlist and, for WAV output, can also be joined into one file.
+
+Every part is written under a temporary name and renamed when complete,
+and ``progress.json`` records the book and the ranges, so an interrupted
+export picks up where it stopped: finished parts are skipped. Only files
+a previous ``progress.json`` recorded are ever removed, and a non-empty
+output directory without one is refused.
+
+Page text goes through the same cache as the reader (audiobook_cache.py).
+
+Usage:
+    python audiobook_export.py book.pdf -o book_audio --pages-per-file 10
+    python audiobook_export.py book.pdf -o book_audio --chapters --workers 8 --concat
+"""
+import argparse
+import json
+import os
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pyttsx3
+
+from audiobook_cache import DEFAULT_DIR, TextCache, file_digest
+from audiobook_pipeline import PageSource
+
+PROGRESS_FILE = "progress.json"
+PLAYLIST_FILE = "playlist.m3u"
+
+
+def page_ranges(page_count, pages_per_file):
+    """[(first, last)] covering every page, ``pages_per_file`` at a time."""
+    return [(first, min(first + pages_per_file, page_count) - 1)
+            for first in range(0, page_count, pages_per_file)]
+
+
+def chapter_ranges(reader):
+    """[(first, last, title)] from the top-level outline, or [] if there is none."""
+    starts = []
+    for item in reader.outline:
+        if isinstance(item, list):  # nested entries belong to the previous chapter
+            continue
+        page = reader.get_destination_page_number(item)
+        if page is not None and (not starts or page > starts[-1][0]):
+            starts.append((page, item.title))
+    if not starts:
+        return []
+    if starts[0][0] > 0:
+        starts.insert(0, (0, "Front matter"))
+    ends = [page - 1 for page, _ in starts[1:]] + [len(reader.pages) - 1]
+    return [(first, last, title) for (first, title), last in zip(starts, ends)]
+
+
+def part_name(index, fmt):
+    return f"part_{index + 1:04d}.{fmt}"
+
+
+# --- Worker processes ---
+_worker = {}
+
+
+def _init_worker(pdf_path, cache_dir, rate, voice):
+    _worker["source"] = PageSource(pdf_path, TextCache(cache_dir) if cache_dir else None)
+    engine = pyttsx3.init()
+    engine.setProperty("rate", rate)
+    if voice:
+        engine.setProperty("voice", voice)
+    _worker["engine"] = engine
+
+
+def _synthesize(task):
+    """Speaks pages ``first``..``last`` into ``output``; returns (index, seconds)."""
+    index, first, last, output = task
+    start = time.perf_counter()
+    source = _worker["source"]
+    text = "\n\n".join(source.text(page) for page in range(first, last + 1)).strip()
+    root, ext = os.path.splitext(output)
+    partial = f"{root}.partial{ext}"  # partial_name()
+    engine = _worker["engine"]
+    engine.save_to_file(text or " ", partial)
+    engine.runAndWait()
+    os.replace(partial, output)  # only complete parts ever carry the final name
+    return index, time.perf_counter() - start
+
+
+# --- Export ---
+def plan_parts(source, pages_per_file=10, chapters=False):
+    """[(first, last, title)] for the whole book."""
+    if chapters:
+        ranges = chapter_ranges(source.reader)
+        if ranges:
+            return ranges
+        print("⚠️ No outline in this PDF; splitting by pages instead")
+    return [(first, last, f"Pages {first}-{last}")
+            for first, last in page_ranges(source.page_count, pages_per_file)]
+
+
+def partial_name(index, fmt):
+    """The name a part is written under until it is complete."""
+    return f"part_{index + 1:04d}.partial.{fmt}"
+
+
+def load_progress(out_dir, digest, parts, fmt):
+    """Returns the part indexes already finished, starting over if the plan changed.
+
+    Only the parts a previous ``progress.json`` recorded are ever deleted; a
+    non-empty directory without one raises FileExistsError instead.
+    """
+    path = os.path.join(out_dir, PROGRESS_FILE)
+    plan = {"digest": digest, "format": fmt, "parts": [list(part) for part in parts]}
+    try:
+        with open(path, encoding="utf-8") as f:
+            previous = json.load(f)
+    except FileNotFoundError:
+        if os.listdir(out_dir):
+            raise FileExistsError(f"{out_dir} is not empty and holds no {PROGRESS_FILE}; "
+                                  "choose a new or empty output directory") from None
+        previous = None
+    except ValueError:
+        previous = None
+    if not isinstance(previous, dict) and os.path.exists(path):
+        raise FileExistsError(f"{path} is unreadable; remove it (and the old parts) to start over")
+    if previous != plan:
+        if previous:  # the parts of another book or split
+            old_fmt = previous.get("format", fmt)
+            for i in range(len(previous.get("parts") or [])):
+                for name in (part_name(i, old_fmt), partial_name(i, old_fmt)):
+                    try:
+                        os.remove(os.path.join(out_dir, name))
+                    except FileNotFoundError:
+                        pass
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(plan, f)
+        return set()
+    return {i for i in range(len(parts)) if os.path.exists(os.path.join(out_dir, part_name(i, fmt)))}
+
+
+def write_playlist(out_dir, parts, fmt):
+    path = os.path.join(out_dir, PLAYLIST_FILE)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("#EXTM3U\n")
+        for i, (_, _, title) in enumerate(parts):
+            f.write(f"#EXTINF:-1,{title}\n{part_name(i, fmt)}\n")
+    return path
+
+
+def concat_wav(paths, output):
+    """Joins WAV files with identical formats into one."""
+    with wave.open(output, "wb") as out:
+        params = None
+        for path in paths:
+            with wave.open(path, "rb") as part:
+                if params is None:
+                    params = part.getparams()
+                    out.setparams(params)
+                elif part.getparams()[:3] != params[:3]:
+                    raise ValueError(f"{path} has a different WAV format")
+                out.writeframes(part.readframes(part.getnframes()))
+
+
+def export(pdf_path, out_dir, pages_per_file=10, chapters=False, workers=None, rate=175,
+           voice=None, fmt="wav", cache_dir=DEFAULT_DIR, concat=False):
+    """Exports a whole book; returns (playlist path, parts synthesized now, parts skipped)."""
+    if concat and fmt != "wav":
+        raise ValueError("--concat needs WAV output")  # before any part is synthesized
+    os.makedirs(out_dir, exist_ok=True)
+    cache = TextCache(cache_dir) if cache_dir else None
+    source = PageSource(pdf_path, cache)
+    parts = plan_parts(source, pages_per_file, chapters)
+    digest = source.digest or file_digest(pdf_path)
+    done = load_progress(out_dir, digest, parts, fmt)
+    tasks = [(i, first, last, os.path.join(out_dir, part_name(i, fmt)))
+             for i, (first, last, _) in enumerate(parts) if i not in done]
+    if done:
+        print(f"⏩ Resuming: {len(done)} of {len(parts)} parts already exported")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(pdf_path, cache_dir, rate, voice)) as pool:
+        futures = [pool.submit(_synthesize, task) for task in tasks]
+        for finished, future in enumerate(as_completed(futures), 1):
+            index, seconds = future.result()
+            print(f"✅ {part_name(index, fmt)} ({parts[index][2]}) in {seconds:.1f}s "
+                  f"[{len(done) + finished}/{len(parts)}]")
+    if tasks:
+        print(f"⏱️ {len(tasks)} parts in {time.perf_counter() - start:.1f}s")
+
+    playlist = write_playlist(out_dir, parts, fmt)
+    if concat:
+        concat_wav([os.path.join(out_dir, part_name(i, fmt)) for i in range(len(parts))],
+                   os.path.join(out_dir, "book.wav"))
+    return playlist, len(tasks), len(done)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a PDF to audio files.")
+    parser.add_argument("pdf")
+    parser.add_argument("-o", "--output", help="output directory (default: <pdf name>_audio)")
+    parser.add_argument("--pages-per-file", type=int, default=10)
+    parser.add_argument("--chapters", action="store_true", help="one file per top-level outline entry")
+    parser.add_argument("--workers", type=int, help="processes (default: one per core)")
+    parser.add_argument("--rate", type=int, default=175, help="speech speed in words per minute")
+    parser.add_argument("--voice", help="pyttsx3 voice id")
+    parser.add_argument("--format", default="wav", help="audio file extension the TTS driver writes")
+    parser.add_argument("--concat", action="store_true", help="also join the parts into book.wav")
+    parser.add_argument("--no-cache", action="store_true", help="do not use the extracted-text cache")
+    args = parser.parse_args(argv)
+    if args.concat and args.format.lstrip(".") != "wav":
+        parser.error("--concat needs --format wav")
+
+    out_dir = args.output or os.path.splitext(args.pdf)[0] + "_audio"
+    try:
+        playlist, _, _ = export(args.pdf, out_dir, args.pages_per_file, args.chapters, args.workers,
+                                args.rate, args.voice, args.format.lstrip("."),
+                                None if args.no_cache else DEFAULT_DIR, args.concat)
+    except FileExistsError as e:
+        parser.error(str(e))
+    print(f"🎧 Playlist saved as {playlist}")
+
+
+if __name__ == "__main__":
+    main()
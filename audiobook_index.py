@@ -0,0 +1,220 @@
+"""Full-text inverted index over the pages of PDFs.
+
+Postings map each word to the (page, sentence) positions it occurs at, per
+book (content hash), in an SQLite table whose primary key is the index
+itself, stored in ``index.db`` next to the text cache. Sentences are numbered
+as the reader speaks them (see audiobook_pipeline.split_sentences), so a
+hit can start playback at the exact sentence.
+
+An IndexBuilder thread adds pages one transaction at a time and records
+which pages are done, so a partly indexed book is searchable at once and
+indexing resumes where it stopped. The same thread answers searches
+between pages, so neither opening the book nor reading candidate pages
+ever runs on the caller's (Tk) thread.
+
+Given the TextCache, the index only keeps books that are in the cache: a
+book's postings are dropped when the cache evicts it.
+
+A search intersects the postings of every word in the query, then checks
+the candidate sentences for the exact phrase and cuts a snippet around it.
+"""
+import os
+import queue
+import re
+import sqlite3
+import threading
+from collections import namedtuple
+
+from audiobook_cache import DEFAULT_DIR
+from audiobook_pipeline import PageSource, split_sentences
+
+_WORD = re.compile(r"\w+")
+SNIPPET_CHARS = 90
+
+Hit = namedtuple("Hit", "page sentence snippet")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    digest TEXT NOT NULL,
+    term TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    sentence INTEGER NOT NULL,
+    PRIMARY KEY (digest, term, page, sentence)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS indexed_pages (
+    digest TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    PRIMARY KEY (digest, page)
+) WITHOUT ROWID;
+"""
+
+
+def words(text):
+    return _WORD.findall(text.lower())
+
+
+def snippet(sentence, term, width=SNIPPET_CHARS):
+    """A window of ``sentence`` around the first occurrence of the word ``term``."""
+    match = re.search(rf"\b{re.escape(term)}\b", sentence, re.IGNORECASE)
+    if match is None or len(sentence) <= width:
+        return sentence[:width] + ("…" if len(sentence) > width else "")
+    start = max(0, min(match.start() - width // 3, len(sentence) - width))
+    return ("…" if start else "") + sentence[start:start + width] + (
+        "…" if start + width < len(sentence) else "")
+
+
+class PageIndex:
+    """Thread-safe inverted index of (page, sentence) postings per book.
+
+    With ``cache`` (a TextCache in the same directory), books the cache no
+    longer holds are forgotten, now and whenever it evicts one.
+    """
+
+    def __init__(self, directory=DEFAULT_DIR, cache=None):
+        os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        if cache is not None:
+            cache.on_evict.append(self.forget)
+            for digest in self.digests() - cache.digests():
+                self.forget(digest)
+
+    def digests(self):
+        with self._lock:
+            return {digest for digest, in self.db.execute(
+                "SELECT DISTINCT digest FROM indexed_pages")}
+
+    def forget(self, digest):
+        """Drops every posting of a book."""
+        with self._lock, self.db:
+            self.db.execute("DELETE FROM postings WHERE digest = ?", (digest,))
+            self.db.execute("DELETE FROM indexed_pages WHERE digest = ?", (digest,))
+
+    def indexed_pages(self, digest):
+        with self._lock:
+            return {page for page, in self.db.execute(
+                "SELECT page FROM indexed_pages WHERE digest = ?", (digest,))}
+
+    def add_page(self, digest, page, sentences):
+        """Indexes one page's sentences in a single transaction."""
+        rows = {(digest, term, page, index)
+                for index, sentence in enumerate(sentences) for term in words(sentence)}
+        with self._lock, self.db:
+            self.db.executemany("INSERT OR IGNORE INTO postings VALUES (?, ?, ?, ?)", rows)
+            self.db.execute("INSERT OR IGNORE INTO indexed_pages VALUES (?, ?)", (digest, page))
+
+    def positions(self, digest, term):
+        with self._lock:
+            return set(self.db.execute(
+                "SELECT page, sentence FROM postings WHERE digest = ? AND term = ?", (digest, term)))
+
+    def search(self, source, query, limit=50):
+        """Returns up to ``limit`` Hits for ``query`` in book order."""
+        terms = words(query)
+        if not terms or source.digest is None:
+            return []
+        # Longer words tend to be rarer: intersecting them first keeps the set small.
+        candidates = None
+        for term in sorted(set(terms), key=len, reverse=True):
+            found = self.positions(source.digest, term)
+            candidates = found if candidates is None else candidates & found
+            if not candidates:
+                return []
+        phrase = f" {' '.join(terms)} "
+        hits = []
+        pages = {}
+        for page, index in sorted(candidates):
+            if page not in pages:
+                pages[page] = split_sentences(source.text(page))
+            sentence = pages[page][index] if index < len(pages[page]) else ""
+            if phrase in f" {' '.join(words(sentence))} ":
+                hits.append(Hit(page, index, snippet(sentence, terms[0])))
+                if len(hits) >= limit:
+                    break
+        return hits
+
+    def close(self):
+        self.db.close()
+
+
+class IndexBuilder:
+    """Indexes the not yet indexed pages of a book on a background thread,
+    and answers the searches queued with search() in between.
+
+    ``source`` is a PageSource, or the path of a PDF to open on the thread
+    (with the TextCache ``cache``). Events:
+
+        ("opened", page_count)
+        ("indexed", pages done, page count)
+        ("hits", query, [Hit])
+        ("error", message)
+    """
+
+    def __init__(self, source, index, cache=None):
+        self.source = source
+        self.path = source.path if isinstance(source, PageSource) else source
+        self.cache = cache
+        self.index = index
+        self.events = queue.Queue()
+        self._queries = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="pdf-index", daemon=True)
+        self._thread.start()
+        return self
+
+    def search(self, query, limit=50):
+        """Queues a search; its hits arrive as a ("hits", query, hits) event."""
+        self._queries.put((query, limit))
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self, timeout=None):
+        if self._thread:
+            self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _answer(self, timeout=0):
+        """Answers the queued searches, waiting up to ``timeout`` for the first."""
+        try:
+            query, limit = self._queries.get(timeout=timeout) if timeout else self._queries.get_nowait()
+            while True:
+                try:
+                    self.events.put(("hits", query, self.index.search(self.source, query, limit)))
+                except Exception as e:
+                    self.events.put(("error", str(e)))
+                query, limit = self._queries.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _run(self):
+        try:
+            if not isinstance(self.source, PageSource):
+                self.source = PageSource(self.source, self.cache)
+            page_count = self.source.page_count
+            self.events.put(("opened", page_count))
+            digest = self.source.digest
+            done = self.index.indexed_pages(digest)
+            self.events.put(("indexed", len(done), page_count))
+            for page in range(page_count):
+                if self._stop.is_set():
+                    return
+                self._answer()
+                if page in done:
+                    continue
+                self.index.add_page(digest, page, split_sentences(self.source.text(page)))
+                done.add(page)
+                self.events.put(("indexed", len(done), page_count))
+        except Exception as e:
+            self.events.put(("error", str(e)))
+            return
+        while not self._stop.is_set():  # fully indexed: keep answering searches
+            self._answer(timeout=0.1)
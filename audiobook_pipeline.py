@@ -0,0 +1,270 @@
+"""Background playback pipeline for the PDF audiobook reader.
+
+Reading is split across two worker threads so the Tk loop never blocks:
+
+* the extractor opens the PDF (hashing it for the text cache and counting
+  its pages when given just a path), then extracts (or reads from the text
+  cache) and cleans pages ahead of the reader, ``prefetch`` pages at most
+  (a bounded queue holds them);
+* the speaker owns the pyttsx3 engine and speaks one page after another,
+  so the next page's text is already waiting when the current one ends.
+
+The GUI only sees progress events, which it drains from ``events`` with
+``root.after``:
+
+    ("opened", page_count)      the PDF is open; nothing is read before this
+    ("page", page, last_page)   started speaking ``page``
+    ("sentence", page, index)   started sentence ``index`` of ``page``
+    ("first_audio", seconds)    time from start() to the first sentence
+    ("finished", page)          finished speaking ``page``
+    ("error", message)
+    ("done",)                   reached the end, or was stopped
+"""
+import queue
+import re
+import threading
+import time
+
+import pyttsx3
+from pypdf import PdfReader
+
+_HYPHENATED = re.compile(r"(\w)-\n(\w)")
+_LINE_BREAK = re.compile(r"(?<!\n)\n(?!\n)")
+_SPACES = re.compile(r"[ \t\r\f\v]+")
+_SENTENCE_END = re.compile(r"[.!?…]+[\"'”’)\]]*\s+|\n{2,}")
+ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "prof.", "st.", "vs.", "etc.", "e.g.", "i.e.",
+                 "fig.", "no.", "p.", "pp.", "vol.", "ch."}
+MAX_SENTENCE = 300  # characters queued to the engine at most at once
+
+
+def clean_text(text):
+    """Joins words and lines broken by the PDF layout so they are read smoothly."""
+    text = _HYPHENATED.sub(r"\1\2", text or "")
+    text = _LINE_BREAK.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def split_sentences(text, max_length=MAX_SENTENCE):
+    """Splits cleaned text into sentences; overlong ones are cut at commas or spaces."""
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        words = text[start:match.start() + 1].split()
+        if words and words[-1].lower() in ABBREVIATIONS:
+            continue
+        sentences.append(text[start:match.end()].strip())
+        start = match.end()
+    sentences.append(text[start:].strip())
+
+    chunks = []
+    for sentence in filter(None, sentences):
+        while len(sentence) > max_length:
+            cut = sentence.rfind(", ", 0, max_length) + 1 or sentence.rfind(" ", 0, max_length)
+            if cut <= 0:
+                cut = max_length
+            chunks.append(sentence[:cut].strip())
+            sentence = sentence[cut:].strip()
+        if sentence:
+            chunks.append(sentence)
+    return chunks
+
+
+class PageSource:
+    """Extracts cleaned page text from one PDF.
+
+    With a TextCache (audiobook_cache.py), pages come from the cache when
+    they can, and the PDF is only parsed once a page is missing.
+    """
+
+    def __init__(self, path, cache=None):
+        self.path = path
+        self.cache = cache
+        self.digest = None
+        self._reader = None
+        self._lock = threading.RLock()  # pypdf readers are not thread-safe
+        page_count = None
+        if cache is not None:
+            self.digest = cache.digest(path)
+            page_count = cache.open_book(self.digest)
+            cache.evict(keep=self.digest)
+        if page_count is None:
+            page_count = len(self.reader.pages)
+            if cache is not None:
+                cache.set_page_count(self.digest, page_count)
+        self.page_count = page_count
+
+    @property
+    def reader(self):
+        with self._lock:
+            if self._reader is None:
+                self._reader = PdfReader(self.path)
+            return self._reader
+
+    def raw_text(self, page):
+        """The page's text as extracted by pypdf."""
+        if self.cache is not None:
+            text = self.cache.get(self.digest, page)
+            if text is not None:
+                return text
+        with self._lock:
+            text = self.reader.pages[page].extract_text() or ""
+        if self.cache is not None:
+            self.cache.put(self.digest, page, text)
+        return text
+
+    def text(self, page):
+        return clean_text(self.raw_text(page))
+
+
+class PlaybackPipeline:
+    """Speaks pages ``first`` to ``last`` (inclusive) on background threads.
+
+    Reading starts at sentence ``sentence`` of the first page. Sentences are
+    queued to the engine ``chunk`` at a time, each at the current speed, so
+    the first audio starts after one short sentence rather than a whole page.
+    With ``bookmarks`` (a TextCache), the sentence being read is saved as it
+    starts.
+
+    ``source`` is a PageSource, or the path of a PDF to open on the extractor
+    thread (with the TextCache ``cache``), so that hashing a big file never
+    blocks the caller. A ``first`` page out of range is reported as an
+    error event once the page count is known.
+    """
+
+    def __init__(self, source, first, last=None, speed=175, prefetch=3, after=None,
+                 sentence=0, chunk=2, bookmarks=None, cache=None):
+        self.source = source
+        self.cache = cache
+        self.first = first
+        self.last = last  # clamped to the page count once the source is open
+        self.sentence = sentence
+        self.speed = speed  # words per minute; read before each sentence
+        self.chunk = chunk
+        self.bookmarks = bookmarks
+        self.position = (first, sentence)
+        self.time_to_first_audio = None
+        self.events = queue.Queue()
+        self._pages = queue.Queue(maxsize=prefetch)
+        self._stop = threading.Event()
+        self._threads = []
+        self._after = after  # a stopped pipeline whose engine must be released first
+        self._started = None
+        self._failed = False
+
+    def start(self):
+        self._started = time.perf_counter()
+        for target, name in ((self._extract, "pdf-extract"), (self._speak, "pdf-speak")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def set_speed(self, speed):
+        """Changes the speed from the next sentence on (safe to call from the Tk thread)."""
+        self.speed = speed
+
+    def stop(self):
+        """Asks both workers to stop; the speaker halts at the next word."""
+        self._stop.set()
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout)
+
+    @property
+    def running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def _put(self, item):
+        # Blocks while the speaker is ``prefetch`` pages behind, but keeps
+        # checking for stop so the thread never hangs on a full queue.
+        while not self._stop.is_set():
+            try:
+                self._pages.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _open(self):
+        """Opens the source if given as a path; returns False if ``first`` is out of range."""
+        if not isinstance(self.source, PageSource):
+            self.source = PageSource(self.source, self.cache)
+        page_count = self.source.page_count
+        self.last = page_count - 1 if self.last is None else min(self.last, page_count - 1)
+        self.events.put(("opened", page_count))
+        if not 0 <= self.first < page_count:
+            self.events.put(("error", f"Page number out of range (0 - {page_count - 1})"))
+            return False
+        return True
+
+    def _extract(self):
+        try:
+            if not self._open():
+                self._failed = True
+                return
+            for page in range(self.first, self.last + 1):
+                if self._stop.is_set():
+                    return
+                self._put((page, split_sentences(self.source.text(page))))
+        except Exception as e:
+            self.events.put(("error", str(e)))
+            self._failed = True  # the end of the book was not reached
+        finally:
+            self._put(None)
+
+    def _on_utterance(self, name):
+        page, index = map(int, name.split(":"))
+        if self.time_to_first_audio is None:
+            self.time_to_first_audio = time.perf_counter() - self._started
+            self.events.put(("first_audio", self.time_to_first_audio))
+        self.position = (page, index)
+        self.events.put(("sentence", page, index))
+        if self.bookmarks is not None:
+            self.bookmarks.save_bookmark(self.source.path, page, index)
+
+    def _speak(self):
+        engine = None
+        tokens = []
+        try:
+            if self._after is not None:
+                self._after.join()
+                self._after = None
+            engine = pyttsx3.init()  # created here: the engine is used on this thread only
+
+            def on_word(name, location, length):
+                if self._stop.is_set():
+                    engine.stop()
+
+            tokens = [engine.connect("started-word", on_word),
+                      engine.connect("started-utterance", self._on_utterance)]
+            while not self._stop.is_set():
+                try:
+                    item = self._pages.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is None:
+                    # Resume with the next page (or start over) unless extraction failed
+                    if self.bookmarks is not None and not self._failed:
+                        following = self.last + 1 if self.last + 1 < self.source.page_count else 0
+                        self.bookmarks.save_bookmark(self.source.path, following, 0)
+                    break
+                page, sentences = item
+                self.events.put(("page", page, self.last))
+                first = self.sentence if page == self.first else 0
+                for start in range(first, len(sentences), self.chunk):
+                    if self._stop.is_set():
+                        break
+                    for index in range(start, min(start + self.chunk, len(sentences))):
+                        engine.setProperty("rate", self.speed)
+                        engine.say(sentences[index], f"{page}:{index}")
+                    engine.runAndWait()
+                if not self._stop.is_set():
+                    self.events.put(("finished", page))
+        except Exception as e:
+            self.events.put(("error", str(e)))
+        finally:
+            if engine is not None:
+                for token in tokens:  # pyttsx3 reuses the engine for the next pipeline
+                    engine.disconnect(token)
+            self._stop.set()
+            self.events.put(("done",))
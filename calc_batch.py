@@ -0,0 +1,237 @@
+"""Headless batch evaluation of calculator expression tapes.
+
+Reads expressions (one per line, or one JSONL column), groups each chunk by
+expression shape and evaluates every group in a single vectorized NumPy pass
+with the operands as arrays. Results are streamed out in input order with a
+per-line status code that mirrors what Calculator.evaluate_expression shows.
+
+Usage:
+    python calc_batch.py tape.txt -o results.tsv
+    python calc_batch.py ledger.jsonl --column expr --format jsonl
+"""
+import argparse
+import json
+import re
+import sys
+
+import numpy as np
+
+import calc_engine
+
+# --- Status codes ---
+OK = "ok"
+DIV_ZERO = "div_zero"
+SYNTAX = "syntax"
+ERROR = "error"
+
+MESSAGES = {
+    DIV_ZERO: calc_engine.DIVIDE_BY_ZERO_MESSAGE,
+    SYNTAX: calc_engine.INVALID_EXPRESSION_MESSAGE,
+}
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Beyond 2**53 float64 stops representing integers exactly, so rows that get
+# there (or overflow) are re-run through the scalar engine for exact results.
+EXACT_LIMIT = 2.0 ** 53
+
+_NUMBER = re.compile(r"(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+_FLOAT = re.compile(r"(?:\d+\.\d*|\.\d+)(?:[eE][+-]?\d+)?|\d+[eE][+-]?\d+")
+_INT = re.compile(r"\d+")
+_LEADING_ZERO = re.compile(r"(?<!\d)0+[1-9]")
+
+
+def split_shape(expression):
+    """Splits an expression into its shape template and number literals.
+
+    The template has every float literal replaced by "f" and every int
+    literal by "i". Returns (template, literals, valid) where ``valid`` is
+    False when an int literal has leading zeros ("07"), which Python rejects.
+    """
+    text = calc_engine.normalize(expression)
+    literals = _NUMBER.findall(text)
+    template = _FLOAT.sub("f", text)
+    valid = _LEADING_ZERO.search(template) is None
+    return _INT.sub("i", template), literals, valid
+
+
+def _run_vectorized(shape, operands):
+    """Runs one compiled shape over a (rows, slots) operand matrix.
+
+    Returns (values, is_int, div_zero, inexact) where the masks flag rows
+    that divided by zero and rows that left the exactly-representable range.
+    """
+    rows = operands.shape[0]
+    div_zero = np.zeros(rows, dtype=bool)
+    inexact = np.zeros(rows, dtype=bool)
+    stack = []
+    slot = 0
+    with np.errstate(all="ignore"):
+        for op in shape:
+            if op == "i" or op == "f":
+                value = operands[:, slot]
+                slot += 1
+                stack.append((value, op == "i"))
+            elif op == "neg":
+                value, is_int = stack.pop()
+                # Integers have no negative zero: -0 is 0, not -0.0.
+                stack.append((-value + 0.0 if is_int else -value, is_int))
+            elif op == "pos":
+                pass
+            else:
+                right, right_int = stack.pop()
+                left, left_int = stack.pop()
+                is_int = left_int and right_int
+                if op == "+":
+                    value = left + right
+                elif op == "-":
+                    value = left - right
+                elif op == "*":
+                    value = left * right
+                else:
+                    zero = right == 0
+                    div_zero |= zero
+                    value = left / np.where(zero, 1.0, right)
+                    is_int = False
+                if is_int:
+                    value = value + 0.0
+                stack.append((value, is_int))
+            inexact |= ~(np.abs(stack[-1][0]) < EXACT_LIMIT)
+    values, is_int = stack[0]
+    return values, is_int, div_zero, inexact
+
+
+def _scalar(expression):
+    """Evaluates one expression with the scalar engine, as the GUI would."""
+    try:
+        return OK, calc_engine.format_result(calc_engine.evaluate(expression))
+    except ZeroDivisionError:
+        return DIV_ZERO, MESSAGES[DIV_ZERO]
+    except SyntaxError:
+        return SYNTAX, MESSAGES[SYNTAX]
+    except Exception as e:
+        return ERROR, f"An error occurred: {e}"
+
+
+def evaluate_batch(expressions):
+    """Evaluates a list of expressions, returning a list of (code, text)."""
+    results = [None] * len(expressions)
+    groups = {}
+    for index, expression in enumerate(expressions):
+        if expression is None:
+            results[index] = (SYNTAX, MESSAGES[SYNTAX])
+            continue
+        template, literals, valid = split_shape(expression)
+        if not valid:
+            results[index] = (SYNTAX, MESSAGES[SYNTAX])
+            continue
+        group = groups.get(template)
+        if group is None:
+            group = groups[template] = (expression, [], [])
+        group[1].append(index)
+        group[2].append(literals)
+
+    for sample, indices, literals in groups.values():
+        try:
+            _evaluate_group(expressions, results, sample, indices, literals)
+        except Exception:
+            # Whatever went wrong with this group, the rest of the tape goes
+            # on; the scalar engine reports these rows one by one.
+            for index in indices:
+                results[index] = _scalar(expressions[index])
+    return results
+
+
+def _evaluate_group(expressions, results, sample, indices, literals):
+    """Fills in the results of one group of same-shaped expressions."""
+    try:
+        program = calc_engine.compile_expression(sample)
+    except SyntaxError:
+        program = None
+    if program is None or len(program.constants) != len(literals[0]):
+        # Invalid shape (or one the template could not describe): let
+        # the scalar engine decide line by line.
+        for index in indices:
+            results[index] = _scalar(expressions[index])
+        return
+
+    if not program.constants:
+        result = _scalar(sample)
+        for index in indices:
+            results[index] = result
+        return
+
+    try:
+        operands = np.array(literals, dtype=np.float64)
+    except (ValueError, OverflowError):
+        for index in indices:
+            results[index] = _scalar(expressions[index])
+        return
+    values, is_int, div_zero, inexact = _run_vectorized(program.shape, operands)
+    for row, index in enumerate(indices):
+        if inexact[row]:
+            results[index] = _scalar(expressions[index])
+        elif div_zero[row]:
+            results[index] = (DIV_ZERO, MESSAGES[DIV_ZERO])
+        else:
+            value = values[row]
+            results[index] = (OK, str(int(value)) if is_int else repr(float(value)))
+
+
+def read_expressions(path, column=None):
+    """Yields expressions from a text file, or from a JSONL column."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if column is None:
+                yield line.rstrip("\r\n")
+                continue
+            try:
+                value = json.loads(line).get(column)
+            except (ValueError, AttributeError):
+                value = None
+            yield value if isinstance(value, str) else (None if value is None else str(value))
+
+
+def iter_chunks(iterable, size):
+    """Groups an iterable into lists of at most ``size`` items."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate a tape of calculator expressions.")
+    parser.add_argument("input", help="text file (one expression per line) or JSONL file")
+    parser.add_argument("--column", help="JSONL field holding the expression")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--format", choices=("tsv", "jsonl"), default="tsv")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    counts = {}
+    line_no = 0
+    try:
+        for chunk in iter_chunks(read_expressions(args.input, args.column), args.chunk_size):
+            lines = []
+            for code, text in evaluate_batch(chunk):
+                line_no += 1
+                counts[code] = counts.get(code, 0) + 1
+                if args.format == "jsonl":
+                    lines.append(json.dumps({"line": line_no, "code": code, "result": text}))
+                else:
+                    lines.append(f"{line_no}\t{code}\t{text}")
+            out.write("\n".join(lines) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Evaluated {line_no} expressions: {counts}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""Headless expression engine for the calculator.
+
+Parses the calculator grammar (numbers, ``.``, ``+ - * /`` and parentheses)
+into a small AST, compiles it to a flat postfix program and caches compiled
+programs by normalized expression text, so replaying the same expressions
+never re-parses them. Nothing here touches Tk, and nothing is ever eval()'d.
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+# --- Messages shown by the GUI (and reported by batch mode) ---
+DIVIDE_BY_ZERO_MESSAGE = "Cannot divide by zero!"
+INVALID_EXPRESSION_MESSAGE = "Invalid expression!"
+
+# --- AST nodes ---
+Num = namedtuple("Num", "value")
+Unary = namedtuple("Unary", "op operand")
+BinOp = namedtuple("BinOp", "op left right")
+
+# A compiled program: ``shape`` is a tuple of opcodes where "i"/"f" mark an
+# int/float operand slot, and ``constants`` holds the operand values in slot
+# order. Expressions that differ only in their numbers share a shape.
+Program = namedtuple("Program", "shape constants")
+
+CACHE_SIZE = 4096
+DIGITS = "0123456789"
+# Deeper nesting is a SyntaxError, as in CPython's parser ("too many nested
+# parentheses"), rather than a RecursionError.
+MAX_DEPTH = 200
+
+
+def tokenize(expression):
+    """Splits an expression into number and operator tokens."""
+    tokens = []
+    i = 0
+    n = len(expression)
+    while i < n:
+        ch = expression[i]
+        if ch.isspace():
+            i += 1
+        elif ch in "+-*/()":
+            tokens.append(ch)
+            i += 1
+        elif ch in DIGITS or ch == ".":
+            start = i
+            while i < n and (expression[i] in DIGITS or expression[i] == "."):
+                i += 1
+            # Results such as "1e+16" are shown in the display and may be
+            # edited further, so accept an exponent suffix as Python does.
+            if i < n and expression[i] in "eE":
+                i += 1
+                if i < n and expression[i] in "+-":
+                    i += 1
+                while i < n and expression[i] in DIGITS:
+                    i += 1
+            tokens.append(_parse_number(expression[start:i]))
+        else:
+            raise SyntaxError(f"unexpected character {ch!r}")
+    return tokens
+
+
+def _parse_number(text):
+    """Converts a literal the same way Python's own parser would."""
+    mantissa, _, exponent = text.lower().partition("e")
+    if mantissa.count(".") > 1 or mantissa in ("", "."):
+        raise SyntaxError(f"invalid number {text!r}")
+    if "e" in text.lower():
+        digits = exponent[1:] if exponent[:1] in ("+", "-") else exponent
+        if not digits or digits.strip(DIGITS):
+            raise SyntaxError(f"invalid number {text!r}")
+        return float(text)
+    if "." in text:
+        return float(text)
+    # Python rejects leading zeros on non-zero integer literals ("07").
+    if len(text) > 1 and text[0] == "0" and text.strip("0"):
+        raise SyntaxError(f"leading zeros in {text!r}")
+    return int(text)
+
+
+class _Parser:
+    """Recursive-descent parser producing the AST for one token list."""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        self.depth = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.expr()
+        if self.pos != len(self.tokens):
+            raise SyntaxError(f"unexpected token {self.peek()!r}")
+        return node
+
+    def expr(self):
+        node = self.term()
+        while self.peek() in ("+", "-"):
+            op = self.take()
+            node = BinOp(op, node, self.term())
+        return node
+
+    def term(self):
+        node = self.factor()
+        while self.peek() in ("*", "/"):
+            op = self.take()
+            node = BinOp(op, node, self.factor())
+        return node
+
+    def factor(self):
+        # A chain of signs is read in a loop: only its parity matters.
+        negate = False
+        token = self.take()
+        while token in ("+", "-"):
+            negate ^= token == "-"
+            token = self.take()
+        node = self.atom(token)
+        return Unary("-", node) if negate else node
+
+    def atom(self, token):
+        if token == "(":
+            self.depth += 1
+            if self.depth > MAX_DEPTH:
+                raise SyntaxError("too many nested parentheses")
+            node = self.expr()
+            if self.take() != ")":
+                raise SyntaxError("missing closing parenthesis")
+            self.depth -= 1
+            return node
+        if isinstance(token, (int, float)):
+            return Num(token)
+        raise SyntaxError("unexpected end of expression" if token is None else f"unexpected token {token!r}")
+
+
+def parse(expression):
+    """Parses an expression string into an AST."""
+    return _Parser(tokenize(expression)).parse()
+
+
+def compile_ast(node):
+    """Flattens an AST into a postfix Program.
+
+    Walks the tree with an explicit stack, so long operator chains (which
+    nest as deeply as they are long) never hit the recursion limit.
+    """
+    shape = []
+    constants = []
+    pending = [node]
+    while pending:
+        n = pending.pop()
+        if isinstance(n, str):  # an operator whose operands are emitted
+            shape.append(n)
+        elif isinstance(n, Num):
+            shape.append("i" if isinstance(n.value, int) else "f")
+            constants.append(n.value)
+        elif isinstance(n, Unary):
+            pending.append("neg" if n.op == "-" else "pos")
+            pending.append(n.operand)
+        else:
+            pending.append(n.op)
+            pending.append(n.right)
+            pending.append(n.left)
+    return Program(tuple(shape), tuple(constants))
+
+
+def normalize(expression):
+    """Collapses whitespace so equivalent inputs share one cache entry."""
+    return " ".join(expression.split())
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _compile_normalized(text):
+    return compile_ast(parse(text))
+
+
+def compile_expression(expression):
+    """Returns the (cached) compiled Program for an expression."""
+    return _compile_normalized(normalize(expression))
+
+
+def run(program):
+    """Executes a compiled Program and returns its numeric value."""
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    constants = iter(program.constants)
+    for op in program.shape:
+        if op == "i" or op == "f":
+            push(next(constants))
+        elif op == "neg":
+            push(-pop())
+        elif op == "pos":
+            push(+pop())
+        else:
+            right = pop()
+            left = pop()
+            if op == "+":
+                push(left + right)
+            elif op == "-":
+                push(left - right)
+            elif op == "*":
+                push(left * right)
+            else:
+                push(left / right)  # raises ZeroDivisionError like eval()
+    return stack[0]
+
+
+def evaluate(expression):
+    """Evaluates an expression string.
+
+    Raises SyntaxError for malformed input and ZeroDivisionError on division
+    by zero, matching what eval() raised for the calculator's grammar.
+    """
+    return run(compile_expression(expression))
+
+
+def format_result(value):
+    """Formats a value the way the calculator display shows it."""
+    return str(value)
+
+
+def cache_info():
+    """Returns hit/miss statistics for the compiled-program cache."""
+    return _compile_normalized.cache_info()
+
+
+# --- Incremental evaluation (live preview) ---
+class _Frame:
+    """Parse state for one parenthesis level."""
+
+    __slots__ = ("total", "add_op", "term", "mul_op", "negate")
+
+    def __init__(self):
+        self.total = None      # value of completed terms
+        self.add_op = "+"      # operator joining the current term to total
+        self.term = None       # value of completed factors in this term
+        self.mul_op = None     # operator joining the next factor to term
+        self.negate = False    # pending unary minus for the next factor
+
+
+def _combine(op, left, right):
+    if op == "+":
+        return left + right
+    if op == "-":
+        return left - right
+    if op == "*":
+        return left * right
+    return left / right
+
+
+class IncrementalEvaluator:
+    """Evaluates an expression as characters are appended to it.
+
+    Each appended character updates a per-parenthesis-level parse state in
+    O(1) amortized time instead of re-scanning the whole string. preview()
+    returns the value of the text so far (closing any open parentheses and
+    ignoring a trailing operator) and result() the final value, raising the
+    same errors as evaluate().
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Clears all state, as if the display were empty."""
+        self.length = 0             # number of characters fed so far
+        self._frames = [_Frame()]
+        self._number = ""           # literal currently being typed
+        self._expect_operand = True
+        self._error = None          # sticky SyntaxError / ZeroDivisionError
+
+    def feed(self, chars):
+        """Appends one or more characters to the expression."""
+        self.length += len(chars)
+        for ch in chars:
+            if isinstance(self._error, SyntaxError):
+                break
+            self._push(ch)
+
+    def _fail(self, message):
+        self._error = SyntaxError(message)
+
+    def _push(self, ch):
+        number = self._number
+        if ch in DIGITS or ch == ".":
+            if not number and not self._expect_operand:
+                return self._fail("missing operator")
+            self._number = number + ch
+        elif ch in "eE" and number and "e" not in number.lower():
+            self._number = number + ch
+        elif ch in "+-" and number[-1:] in ("e", "E"):
+            self._number = number + ch
+        elif ch.isspace():
+            if number:
+                self._end_number()
+        elif ch in "+-":
+            if number:
+                self._end_number()
+            frame = self._frames[-1]
+            if self._expect_operand:
+                if ch == "-":
+                    frame.negate = not frame.negate
+                return
+            self._end_term(frame)
+            frame.add_op = ch
+            self._expect_operand = True
+        elif ch in "*/":
+            if number:
+                self._end_number()
+            if self._expect_operand:
+                return self._fail("missing operand")
+            self._frames[-1].mul_op = ch
+            self._expect_operand = True
+        elif ch == "(":
+            if number or not self._expect_operand:
+                return self._fail("missing operator")
+            if len(self._frames) > MAX_DEPTH:
+                return self._fail("too many nested parentheses")
+            self._frames.append(_Frame())
+        elif ch == ")":
+            if number:
+                self._end_number()
+            if self._expect_operand or len(self._frames) == 1:
+                return self._fail("unbalanced parenthesis")
+            frame = self._frames.pop()
+            self._end_term(frame)
+            self._add_factor(frame.total)
+        else:
+            self._fail(f"unexpected character {ch!r}")
+
+    def _end_number(self):
+        text = self._number
+        self._number = ""
+        try:
+            value = _parse_number(text)
+        except SyntaxError as e:
+            self._error = e
+            return
+        self._add_factor(value)
+
+    def _add_factor(self, value):
+        frame = self._frames[-1]
+        if frame.negate:
+            value = -value
+            frame.negate = False
+        if frame.term is None:
+            frame.term = value
+        elif self._error is None:
+            try:
+                frame.term = _combine(frame.mul_op, frame.term, value)
+            except ZeroDivisionError as e:
+                self._error = e
+        self._expect_operand = False
+
+    @staticmethod
+    def _end_term(frame):
+        if frame.total is None:
+            frame.total = frame.term
+        elif frame.term is not None:
+            frame.total = _combine(frame.add_op, frame.total, frame.term)
+        frame.term = None
+        frame.mul_op = None
+
+    def preview(self):
+        """Returns the running value, or None if there is nothing to show.
+
+        Raises the sticky error, if any. Cost is proportional to the current
+        parenthesis depth, not to the length of the expression.
+        """
+        if self._error is not None:
+            raise self._error
+        factor = None
+        if self._number:
+            try:
+                factor = _parse_number(self._number)
+            except SyntaxError:
+                factor = None
+        for frame in reversed(self._frames):
+            term = frame.term
+            if factor is not None:
+                if frame.negate:
+                    factor = -factor
+                term = factor if term is None else _combine(frame.mul_op, term, factor)
+            if frame.total is None:
+                factor = term
+            elif term is None:
+                factor = frame.total
+            else:
+                factor = _combine(frame.add_op, frame.total, term)
+        return factor
+
+    def result(self):
+        """Returns the final value, raising like evaluate() would."""
+        if isinstance(self._error, SyntaxError):
+            raise self._error
+        if self._number:
+            _parse_number(self._number)
+        elif self._expect_operand:
+            raise SyntaxError("unexpected end of expression")
+        if len(self._frames) != 1:
+            raise SyntaxError("missing closing parenthesis")
+        return self.preview()
@@ -0,0 +1,185 @@
+"""Cross-validation and feature-set search for the house price model.
+
+Evaluates candidate feature sets (area, bedrooms, washrooms and their
+pairwise interactions such as ``area*bedrooms``) with k-fold or time-split
+validation. Every (feature set, fold) pair runs as its own task in a
+process pool; the data matrix and the row order live in shared memory that
+the workers attach to once, so nothing but a few indices is pickled per task.
+
+Usage:
+    python house_cv.py listings.csv --folds 5
+    python house_cv.py listings.npy --split time --features area,bedrooms --features area,area*bedrooms
+"""
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from house_model import DEFAULT_CHUNK_ROWS, FEATURES, LinearStats, iter_chunks
+
+
+def default_candidates():
+    """Every non-empty subset of the base features, then each interaction on top of all three."""
+    candidates = []
+    for size in range(1, len(FEATURES) + 1):
+        candidates.extend(list(c) for c in itertools.combinations(FEATURES, size))
+    for a, b in itertools.combinations(FEATURES, 2):
+        candidates.append(list(FEATURES) + [f"{a}*{b}"])
+    return candidates
+
+
+def design_matrix(data, features):
+    """Builds the columns named in ``features`` from rows of base features.
+
+    A name like ``area*bedrooms`` is the product of those base columns.
+    """
+    columns = []
+    for feature in features:
+        column = np.ones(data.shape[0])
+        for name in feature.split("*"):
+            column = column * data[:, FEATURES.index(name.strip())]
+        columns.append(column)
+    return np.column_stack(columns)
+
+
+def regression_metrics(y, y_pred):
+    """Returns (mae, rmse, r2) like sklearn's metrics in HousePredictionModel.py."""
+    residuals = y - y_pred
+    mae = np.abs(residuals).mean()
+    rmse = np.sqrt((residuals ** 2).mean())
+    sst = ((y - y.mean()) ** 2).sum()
+    r2 = 1 - (residuals ** 2).sum() / sst if sst > 0 else float("nan")
+    return mae, rmse, r2
+
+
+def make_folds(n_rows, n_folds, split="kfold"):
+    """Returns (train_ranges, test_range) pairs over positions in the row order.
+
+    ``kfold`` tests on each of ``n_folds`` contiguous blocks of a shuffled
+    order and trains on the rest. ``time`` keeps rows in file order and
+    trains on everything before each test block (an expanding window).
+    """
+    bounds = np.linspace(0, n_rows, n_folds + 2 if split == "time" else n_folds + 1).astype(int)
+    folds = []
+    if split == "time":
+        for i in range(1, n_folds + 1):
+            folds.append((((0, int(bounds[i])),), (int(bounds[i]), int(bounds[i + 1]))))
+    else:
+        for i in range(n_folds):
+            a, b = int(bounds[i]), int(bounds[i + 1])
+            folds.append((((0, a), (b, n_rows)), (a, b)))
+    return folds
+
+
+# --- Shared memory ---
+_shared = {}
+
+
+def _share(array):
+    """Copies an array into a new shared memory block."""
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    view[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _attach(spec):
+    name, shape, dtype = spec
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _init_worker(data_spec, order_spec):
+    _shared["data_block"], _shared["data"] = _attach(data_spec)
+    _shared["order_block"], _shared["order"] = _attach(order_spec)
+
+
+def _evaluate(task):
+    """Fits one feature set on one fold's training rows and scores its test rows."""
+    features, fold_index, (train_ranges, (a, b)) = task
+    data, order = _shared["data"], _shared["order"]
+    train_rows = np.concatenate([order[start:stop] for start, stop in train_ranges])
+    test_rows = order[a:b]
+
+    stats = LinearStats(len(features))
+    for start in range(0, len(train_rows), DEFAULT_CHUNK_ROWS):
+        chunk = data[train_rows[start:start + DEFAULT_CHUNK_ROWS]]
+        stats.add(design_matrix(chunk, features), chunk[:, -1])
+    coef, intercept = stats.solve()
+
+    test = data[test_rows]
+    y_pred = design_matrix(test, features) @ coef + intercept
+    return features, fold_index, regression_metrics(test[:, -1], y_pred)
+
+
+def cross_validate(data, candidates, n_folds=5, split="kfold", workers=None, seed=0):
+    """Runs every candidate on every fold across a process pool.
+
+    Returns {feature set (as a tuple): [(mae, rmse, r2) per fold]}.
+    """
+    data = np.ascontiguousarray(data, dtype=np.float64)
+    if split == "time":
+        order = np.arange(len(data))
+    else:
+        order = np.random.default_rng(seed).permutation(len(data))
+    folds = make_folds(len(data), n_folds, split)
+    tasks = [(list(features), i, fold) for features in candidates for i, fold in enumerate(folds)]
+
+    data_block, data_spec = _share(data)
+    order_block, order_spec = _share(order)
+    results = {tuple(features): [None] * len(folds) for features in candidates}
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(data_spec, order_spec)) as pool:
+            for features, fold_index, metrics in pool.map(_evaluate, tasks):
+                results[tuple(features)][fold_index] = metrics
+    finally:
+        for block in (data_block, order_block):
+            block.close()
+            block.unlink()
+    return results
+
+
+def load_matrix(path):
+    """Reads a whole data file as one (rows, features + 1) matrix."""
+    if str(path).endswith(".npy"):
+        return np.load(path)
+    return np.vstack([np.column_stack([X, y]) for X, y in iter_chunks(path)])
+
+
+def print_table(results):
+    """Prints per-fold metrics for each candidate, best mean RMSE first."""
+    ranked = sorted(results.items(), key=lambda item: np.mean([m[1] for m in item[1]]))
+    for features, folds in ranked:
+        print(f"\n📐 Features: {', '.join(features)}")
+        print(f"{'fold':>6} {'MAE':>12} {'RMSE':>12} {'R²':>10}")
+        for i, (mae, rmse, r2) in enumerate(folds):
+            print(f"{i:>6} {mae:>12.4f} {rmse:>12.4f} {r2:>10.4f}")
+        mae, rmse, r2 = np.mean(folds, axis=0)
+        print(f"{'mean':>6} {mae:>12.4f} {rmse:>12.4f} {r2:>10.4f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cross-validate house price feature sets.")
+    parser.add_argument("data", help="CSV or .npy of area,bedrooms,washrooms,price rows")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--split", choices=("kfold", "time"), default="kfold",
+                        help="time keeps file order and trains only on earlier rows")
+    parser.add_argument("--features", action="append",
+                        help="comma-separated feature set, e.g. area,area*bedrooms (repeatable)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    candidates = ([[name.strip() for name in f.split(",")] for f in args.features] if args.features
+                  else default_candidates())
+    results = cross_validate(load_matrix(args.data), candidates, args.folds,
+                             args.split, args.workers, args.seed)
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
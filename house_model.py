@@ -0,0 +1,310 @@
+"""Headless, out-of-core trainer for the house price model.
+
+Streams a CSV or ``.npy`` file of listings in chunks and accumulates the
+sufficient statistics of a linear regression (XᵀX, Xᵀy, Σy, Σy², n), so peak
+memory is O(features²) instead of O(rows). The normal equations are solved
+once at the end. Only NumPy is needed - no sklearn, no matplotlib.
+
+The statistics can be saved as a ModelState and updated later: new sales are
+folded in, and sales that leave a sliding window are taken out, with
+Woodbury (rank-k Sherman-Morrison) updates of the inverse, without touching
+the rest of history.
+
+Each row is ``area, bedrooms, washrooms, price`` (the last column is the
+target), like the X / y arrays in HousePredictionModel.py.
+
+Usage:
+    python house_model.py train listings.csv
+    python house_model.py train listings.npy --chunk-rows 500000 --save state.npz
+    python house_model.py update state.npz --add new_sales.csv --remove expired.csv
+"""
+import argparse
+import itertools
+import os
+
+import numpy as np
+
+FEATURES = ("area", "bedrooms", "washrooms")
+DEFAULT_CHUNK_ROWS = 100_000
+
+
+# --- Reading data in chunks ---
+def iter_csv_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yields (X, y) float arrays of at most ``chunk_rows`` rows from a CSV."""
+    with open(path, encoding="utf-8") as f:
+        first = f.readline()
+        try:
+            [float(v) for v in first.split(",")]
+            pending = [first]  # no header row
+        except ValueError:
+            pending = []
+        while True:
+            lines = pending + list(itertools.islice(f, chunk_rows - len(pending)))
+            pending = []
+            lines = [line for line in lines if line.strip()]
+            if not lines:
+                return
+            data = np.loadtxt(lines, delimiter=",", ndmin=2, dtype=np.float64)
+            yield data[:, :-1], data[:, -1]
+
+
+def iter_npy_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yields (X, y) chunks from a memory-mapped ``.npy`` matrix."""
+    data = np.load(path, mmap_mode="r")
+    for start in range(0, data.shape[0], chunk_rows):
+        block = np.asarray(data[start:start + chunk_rows], dtype=np.float64)
+        yield block[:, :-1], block[:, -1]
+
+
+def iter_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yields (X, y) chunks from a CSV or ``.npy`` file."""
+    if str(path).endswith(".npy"):
+        return iter_npy_chunks(path, chunk_rows)
+    return iter_csv_chunks(path, chunk_rows)
+
+
+def _augment(X):
+    """Prepends the intercept column of ones."""
+    return np.hstack([np.ones((X.shape[0], 1)), X])
+
+
+# --- Sufficient statistics ---
+class LinearStats:
+    """Running sufficient statistics for ordinary least squares."""
+
+    def __init__(self, n_features=len(FEATURES)):
+        self.reset(n_features)
+
+    def reset(self, n_features=None):
+        """Clears the statistics (keeping the number of features by default)."""
+        size = self.xty.size if n_features is None else n_features + 1
+        self.xtx = np.zeros((size, size))
+        self.xty = np.zeros(size)
+        self.count = 0
+        self.sum_y = 0.0
+        self.sum_y2 = 0.0
+
+    def add(self, X, y):
+        """Folds a chunk of rows into the statistics."""
+        A = _augment(np.asarray(X, dtype=np.float64))
+        y = np.asarray(y, dtype=np.float64)
+        self.xtx += A.T @ A
+        self.xty += A.T @ y
+        self.count += len(y)
+        self.sum_y += y.sum()
+        self.sum_y2 += y @ y
+
+    def remove(self, X, y):
+        """Takes a chunk of previously added rows back out of the statistics."""
+        A = _augment(np.asarray(X, dtype=np.float64))
+        y = np.asarray(y, dtype=np.float64)
+        self.xtx -= A.T @ A
+        self.xty -= A.T @ y
+        self.count -= len(y)
+        self.sum_y -= y.sum()
+        self.sum_y2 -= y @ y
+        if self.count == 0:
+            self.reset()  # exactly empty, not the rounding left by the subtractions
+
+    def solve(self):
+        """Solves the normal equations, returning (coef, intercept)."""
+        beta = np.linalg.lstsq(self.xtx, self.xty, rcond=None)[0]
+        return beta[1:], beta[0]
+
+    def metrics(self, coef, intercept):
+        """Returns (rmse, r2) of a model over the accumulated rows.
+
+        Both follow from the statistics alone:
+        SSE = yᵀy - 2βᵀXᵀy + βᵀXᵀXβ and SST = yᵀy - n·ȳ².
+        Both are NaN when there are no rows.
+        """
+        if self.count == 0:
+            return float("nan"), float("nan")
+        beta = np.concatenate([[intercept], coef])
+        sse = max(self.sum_y2 - 2 * beta @ self.xty + beta @ self.xtx @ beta, 0.0)
+        sst = self.sum_y2 - self.sum_y ** 2 / self.count
+        rmse = np.sqrt(sse / self.count)
+        r2 = 1 - sse / sst if sst > 0 else float("nan")
+        return rmse, r2
+
+
+# --- Persisted, incrementally updated model ---
+class ModelState:
+    """Fitted coefficients plus the statistics needed to update them.
+
+    Keeps the inverse P = (XᵀX)⁻¹ alongside the statistics. Adding or
+    removing k rows updates P with the Woodbury identity in O(k·d² + k³)
+    and the coefficients as P·Xᵀy in O(d²), so a refit never revisits old
+    rows. XᵀX itself stays exact, and P is rebuilt from it whenever an
+    update would be no cheaper or numerically unsafe.
+    """
+
+    # An update whose Woodbury capacitance matrix is this ill-conditioned
+    # is replaced by a fresh inverse of XᵀX.
+    MAX_CONDITION = 1e10
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.inverse = None
+        self._refresh()
+
+    def _refresh(self):
+        """Recomputes the inverse and coefficients from XᵀX."""
+        xtx = self.stats.xtx
+        if self.stats.count and np.linalg.matrix_rank(xtx) == xtx.shape[0]:
+            self.inverse = np.linalg.inv(xtx)
+        else:
+            # Too few distinct rows so far (or an empty window): no inverse to maintain.
+            self.inverse = None
+            self.coef, self.intercept = self.stats.solve() if self.stats.count else (
+                np.zeros(self.stats.xty.size - 1), 0.0)
+            return
+        self._update_coefficients()
+
+    def _update_coefficients(self):
+        beta = self.inverse @ self.stats.xty
+        self.coef, self.intercept = beta[1:], beta[0]
+
+    def _woodbury(self, A, sign):
+        """Applies (XᵀX ± AᵀA)⁻¹ to the stored inverse; False if unsafe."""
+        P = self.inverse
+        PA = P @ A.T                                   # d×k
+        capacitance = np.eye(A.shape[0]) + sign * (A @ PA)
+        if np.linalg.cond(capacitance) > self.MAX_CONDITION:
+            return False
+        self.inverse = P - sign * PA @ np.linalg.solve(capacitance, PA.T)
+        return True
+
+    def _apply(self, X, y, sign):
+        X = np.asarray(X, dtype=np.float64)
+        if sign > 0:
+            self.stats.add(X, y)
+        else:
+            self.stats.remove(X, y)
+        A = _augment(X)
+        if (self.inverse is None or not self.stats.count or A.shape[0] > A.shape[1]
+                or not self._woodbury(A, sign)):
+            self._refresh()
+        else:
+            self._update_coefficients()
+
+    def add(self, X, y):
+        """Folds new rows into the model."""
+        self._apply(X, y, +1)
+
+    def remove(self, X, y):
+        """Drops rows that are no longer part of the training window."""
+        self._apply(X, y, -1)
+
+    def metrics(self):
+        """Returns (rmse, r2) of the current model over its rows."""
+        return self.stats.metrics(self.coef, self.intercept)
+
+    def save(self, path):
+        """Writes the state to an ``.npz`` file."""
+        stats = self.stats
+        np.savez(path, coef=self.coef, intercept=self.intercept,
+                 xtx=stats.xtx, xty=stats.xty, count=stats.count,
+                 sum_y=stats.sum_y, sum_y2=stats.sum_y2,
+                 inverse=self.inverse if self.inverse is not None else np.empty((0, 0)))
+
+    @classmethod
+    def load(cls, path):
+        """Reads a state written by save()."""
+        with np.load(path) as data:
+            stats = LinearStats(data["xty"].size - 1)
+            stats.xtx = data["xtx"]
+            stats.xty = data["xty"]
+            stats.count = int(data["count"])
+            stats.sum_y = float(data["sum_y"])
+            stats.sum_y2 = float(data["sum_y2"])
+            state = cls.__new__(cls)
+            state.stats = stats
+            state.inverse = data["inverse"] if data["inverse"].size else None
+            state.coef = data["coef"]
+            state.intercept = float(data["intercept"])
+        return state
+
+
+def fit_stream(chunks, n_features=len(FEATURES)):
+    """Accumulates LinearStats over an iterable of (X, y) chunks."""
+    stats = LinearStats(n_features)
+    for X, y in chunks:
+        stats.add(X, y)
+    return stats
+
+
+def mean_absolute_error_stream(chunks, coef, intercept):
+    """Computes MAE of a fitted model over (X, y) chunks.
+
+    Unlike RMSE and R², MAE cannot be recovered from XᵀX / Xᵀy, so it needs
+    the residuals of the final model and therefore its own pass.
+    """
+    total = 0.0
+    count = 0
+    for X, y in chunks:
+        total += np.abs(y - (X @ coef + intercept)).sum()
+        count += len(y)
+    return total / count if count else float("nan")
+
+
+def train(path, chunk_rows=DEFAULT_CHUNK_ROWS, with_mae=True):
+    """Trains on a file and returns a dict with the fit and its metrics."""
+    stats = fit_stream(iter_chunks(path, chunk_rows))
+    coef, intercept = stats.solve()
+    rmse, r2 = stats.metrics(coef, intercept)
+    mae = mean_absolute_error_stream(iter_chunks(path, chunk_rows), coef, intercept) if with_mae else None
+    return {"coef": coef, "intercept": intercept, "rows": stats.count,
+            "mae": mae, "rmse": rmse, "r2": r2, "stats": stats}
+
+
+def print_report(result):
+    """Prints the fit the same way HousePredictionModel.py does."""
+    print("🔢 Coefficients:", result["coef"])
+    print("⚓ Intercept:", result["intercept"])
+    if result["mae"] is not None:
+        print("📏 MAE (Mean Absolute Error):", result["mae"])
+    print("📏 RMSE (Root Mean Squared Error):", result["rmse"])
+    print("📊 R² Score:", result["r2"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="House price model tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train_cmd = commands.add_parser("train", help="fit the model by streaming a CSV or .npy file")
+    train_cmd.add_argument("data", help="rows of area,bedrooms,washrooms,price")
+    train_cmd.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    train_cmd.add_argument("--no-mae", action="store_true",
+                           help="skip the second pass that MAE needs")
+    train_cmd.add_argument("--save", metavar="STATE", help="persist the fitted state (.npz)")
+
+    update_cmd = commands.add_parser("update", help="fold rows into (or out of) a saved state")
+    update_cmd.add_argument("state", help="state file written by train --save (created if missing)")
+    update_cmd.add_argument("--add", metavar="DATA", help="new rows to fold in")
+    update_cmd.add_argument("--remove", metavar="DATA", help="rows leaving the training window")
+    update_cmd.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+
+    args = parser.parse_args(argv)
+    if args.command == "train":
+        result = train(args.data, args.chunk_rows, with_mae=not args.no_mae)
+        print(f"Trained on {result['rows']} rows")
+        print_report(result)
+        if args.save:
+            ModelState(result["stats"]).save(args.save)
+            print(f"Model state saved as {args.save}")
+    elif args.command == "update":
+        state = ModelState.load(args.state) if os.path.exists(args.state) else ModelState(LinearStats())
+        for path, apply in ((args.add, state.add), (args.remove, state.remove)):
+            if path:
+                for X, y in iter_chunks(path, args.chunk_rows):
+                    apply(X, y)
+        state.save(args.state)
+        rmse, r2 = state.metrics()
+        print(f"Model now covers {state.stats.count} rows")
+        print_report({"coef": state.coef, "intercept": state.intercept,
+                      "mae": None, "rmse": rmse, "r2": r2})
+
+
+if __name__ == "__main__":
+    main()
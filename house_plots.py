@@ -0,0 +1,136 @@
+"""Aggregated Actual-vs-Predicted and residual plots for large datasets.
+
+Steps 7 and 8 of HousePredictionModel.py scatter every single house, which
+takes minutes and draws an unreadable blob at a million points. Here the
+(actual, predicted) pairs and the residuals are binned into 2-D histograms
+with NumPy while streaming the data, and only the bin counts are drawn.
+
+Pass ``--png DIR`` to render headlessly (Agg backend, no window) for batch
+jobs; without it the plots are shown interactively.
+
+Usage:
+    python house_plots.py house_model.npz listings.csv
+    python house_plots.py house_model.npz listings.npy --png plots/ --bins 300
+"""
+import argparse
+import os
+
+import numpy as np
+
+from house_model import DEFAULT_CHUNK_ROWS, iter_chunks
+from house_predict import load_model, predict
+
+DEFAULT_BINS = 200
+
+
+def _edges(lo, hi, bins):
+    """Bin edges over [lo, hi], widened when every value is the same."""
+    if not hi > lo:
+        lo, hi = lo - 0.5, hi + 0.5
+    return np.linspace(lo, hi, bins + 1)
+
+
+class BinnedPlots:
+    """2-D histograms of actual vs predicted and of residuals by house index."""
+
+    def __init__(self, price_range, residual_range, n_rows, bins=DEFAULT_BINS):
+        self.price_edges = _edges(*price_range, bins)
+        self.residual_edges = _edges(*residual_range, bins)
+        self.index_edges = _edges(0, n_rows, bins)
+        self.actual_vs_predicted = np.zeros((bins, bins))
+        self.residuals = np.zeros((bins, bins))
+        self.seen = 0
+
+    def add(self, y, y_pred):
+        """Bins one chunk of actual and predicted prices."""
+        index = np.arange(self.seen, self.seen + len(y))
+        self.seen += len(y)
+        self.actual_vs_predicted += np.histogram2d(
+            y, y_pred, bins=(self.price_edges, self.price_edges))[0]
+        self.residuals += np.histogram2d(
+            index, y - y_pred, bins=(self.index_edges, self.residual_edges))[0]
+
+
+def _ranges(chunks, coef, intercept):
+    """First pass: price and residual extremes, plus the row count."""
+    lo, hi = np.inf, -np.inf
+    r_lo, r_hi = np.inf, -np.inf
+    rows = 0
+    for X, y in chunks:
+        y_pred = predict(X, coef, intercept)
+        residuals = y - y_pred
+        lo = min(lo, y.min(), y_pred.min())
+        hi = max(hi, y.max(), y_pred.max())
+        r_lo, r_hi = min(r_lo, residuals.min()), max(r_hi, residuals.max())
+        rows += len(y)
+    return (lo, hi), (r_lo, r_hi), rows
+
+
+def bin_file(model_path, data_path, bins=DEFAULT_BINS, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Streams a data file twice (ranges, then counts) into BinnedPlots."""
+    coef, intercept = load_model(model_path)
+    price_range, residual_range, rows = _ranges(iter_chunks(data_path, chunk_rows), coef, intercept)
+    binned = BinnedPlots(price_range, residual_range, rows, bins)
+    for X, y in iter_chunks(data_path, chunk_rows):
+        binned.add(y, predict(X, coef, intercept))
+    return binned
+
+
+def render(binned, png_dir=None):
+    """Draws both plots; saves PNGs to ``png_dir`` instead of showing them."""
+    import matplotlib
+    if png_dir:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LogNorm
+
+    # 🖼️ Actual vs Predicted Prices
+    fig, ax = plt.subplots(figsize=(8, 7))
+    edges = binned.price_edges
+    counts = np.ma.masked_equal(binned.actual_vs_predicted.T, 0)
+    mesh = ax.pcolormesh(edges, edges, counts, norm=LogNorm(), cmap="viridis")
+    ax.plot(edges[[0, -1]], edges[[0, -1]], color="red", linewidth=1, label="Perfect prediction")
+    fig.colorbar(mesh, ax=ax, label="Houses per bin")
+    ax.set_title("Actual vs Predicted House Prices")
+    ax.set_xlabel("Actual Price (in ₹ Thousands)")
+    ax.set_ylabel("Predicted Price (in ₹ Thousands)")
+    ax.legend()
+    ax.grid(True)
+    figures = [("actual_vs_predicted.png", fig)]
+
+    # 🖼️ Residuals (how far off the predictions were)
+    fig, ax = plt.subplots(figsize=(10, 4))
+    counts = np.ma.masked_equal(binned.residuals.T, 0)
+    mesh = ax.pcolormesh(binned.index_edges, binned.residual_edges, counts, norm=LogNorm(), cmap="magma")
+    ax.axhline(y=0, color="black", linestyle="--")  # Line at zero error
+    fig.colorbar(mesh, ax=ax, label="Houses per bin")
+    ax.set_title("Residual Plot (Error for Each House)")
+    ax.set_xlabel("House Index")
+    ax.set_ylabel("Error (Actual - Predicted)")
+    ax.grid(True)
+    figures.append(("residuals.png", fig))
+
+    if png_dir:
+        os.makedirs(png_dir, exist_ok=True)
+        for name, figure in figures:
+            figure.savefig(os.path.join(png_dir, name), dpi=120, bbox_inches="tight")
+            plt.close(figure)
+            print(f"Plot saved as {os.path.join(png_dir, name)}")
+    else:
+        plt.show()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plot binned model diagnostics.")
+    parser.add_argument("model", help="model artifact (.npz)")
+    parser.add_argument("data", help="CSV or .npy of area,bedrooms,washrooms,price rows")
+    parser.add_argument("--bins", type=int, default=DEFAULT_BINS)
+    parser.add_argument("--png", metavar="DIR", help="write PNGs here instead of opening windows")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    render(bin_file(args.model, args.data, args.bins, args.chunk_rows), args.png)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Fast-start batch scoring for the house price model.
+
+Loads a saved model artifact (an ``.npz`` with ``coef`` and ``intercept``,
+as written by HousePredictionModel.py or ``house_model.py train --save``)
+and scores a CSV or Parquet file of houses. Each chunk of rows is scored
+with a single matrix multiply and written out immediately, so memory stays
+flat however large the input is.
+
+Only NumPy is imported at start-up; pyarrow is imported only for Parquet
+input. matplotlib and sklearn are never imported.
+
+Usage:
+    python house_predict.py house_model.npz houses.csv -o predictions.csv
+    python house_predict.py house_model.npz houses.parquet > predictions.csv
+"""
+import argparse
+import itertools
+import sys
+
+import numpy as np
+
+from house_model import DEFAULT_CHUNK_ROWS, FEATURES
+
+
+def load_model(path):
+    """Returns (coef, intercept) from a model artifact."""
+    with np.load(path) as data:
+        return np.asarray(data["coef"], dtype=np.float64), float(data["intercept"])
+
+
+def save_model(path, coef, intercept):
+    """Writes a model artifact that load_model() can read."""
+    np.savez(path, coef=np.asarray(coef, dtype=np.float64), intercept=float(intercept))
+
+
+def predict(X, coef, intercept):
+    """Scores a (rows, features) matrix in one vectorized multiply."""
+    return X @ coef + intercept
+
+
+# --- Reading houses in chunks ---
+def iter_csv_features(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yields feature matrices from a CSV.
+
+    With a header, the area/bedrooms/washrooms columns are picked by name;
+    without one, the first three columns are used.
+    """
+    with open(path, encoding="utf-8") as f:
+        first = f.readline()
+        names = [name.strip().lower() for name in first.split(",")]
+        try:
+            [float(v) for v in names]
+            pending = [first]
+            columns = list(range(len(FEATURES)))
+        except ValueError:
+            pending = []
+            columns = [names.index(name) for name in FEATURES]
+        while True:
+            lines = pending + list(itertools.islice(f, chunk_rows - len(pending)))
+            pending = []
+            lines = [line for line in lines if line.strip()]
+            if not lines:
+                return
+            yield np.loadtxt(lines, delimiter=",", usecols=columns, ndmin=2, dtype=np.float64)
+
+
+def iter_parquet_features(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yields feature matrices from a Parquet file, one record batch at a time."""
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=list(FEATURES)):
+        yield np.column_stack([batch.column(name).to_numpy(zero_copy_only=False).astype(np.float64)
+                               for name in FEATURES])
+
+
+def iter_features(path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yields feature matrices from a CSV or Parquet file."""
+    if str(path).endswith((".parquet", ".pq")):
+        return iter_parquet_features(path, chunk_rows)
+    return iter_csv_features(path, chunk_rows)
+
+
+def score_file(model_path, data_path, out, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Streams predictions for every house in ``data_path`` to ``out``."""
+    coef, intercept = load_model(model_path)
+    out.write(",".join(FEATURES) + ",predicted_price\n")
+    rows = 0
+    for X in iter_features(data_path, chunk_rows):
+        np.savetxt(out, np.column_stack([X, predict(X, coef, intercept)]),
+                   delimiter=",", fmt="%.10g")
+        rows += len(X)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score houses with a saved price model.")
+    parser.add_argument("model", help="model artifact (.npz)")
+    parser.add_argument("data", help="CSV or Parquet file of houses")
+    parser.add_argument("-o", "--output", help="output CSV (default: stdout)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        rows = score_file(args.model, args.data, out, args.chunk_rows)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Scored {rows} houses", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
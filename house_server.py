@@ -0,0 +1,190 @@
+"""Local micro-batching prediction server for the house price model.
+
+Keeps the coefficients from a model artifact in memory and answers
+``POST /predict`` over HTTP. Concurrent requests are queued and coalesced
+into micro-batches of up to ``--max-batch`` rows or ``--max-wait-ms``
+milliseconds, whichever comes first, and each batch is scored with one
+vectorized predict. ``GET /metrics`` returns latency and batch-size
+histograms.
+
+Request body: ``{"rows": [[area, bedrooms, washrooms], ...]}`` or a single
+``{"area": ..., "bedrooms": ..., "washrooms": ...}``.
+Response: ``{"predictions": [...]}``.
+
+Usage:
+    python house_server.py house_model.npz --port 8765 --max-batch 256 --max-wait-ms 2
+"""
+import argparse
+import bisect
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from house_model import FEATURES
+from house_predict import load_model, predict
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096)
+
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket is +Inf
+        self.total = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, value):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds, value)] += 1
+            self.total += 1
+            self.sum += value
+
+    def snapshot(self):
+        with self._lock:
+            buckets = {str(b): c for b, c in zip(self.bounds, self.counts)}
+            buckets["+Inf"] = self.counts[-1]
+            return {"count": self.total, "sum": self.sum, "buckets": buckets}
+
+
+class MicroBatcher:
+    """Coalesces queued prediction requests into vectorized batches."""
+
+    def __init__(self, coef, intercept, max_batch=256, max_wait_ms=2.0):
+        self.coef = coef
+        self.intercept = intercept
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.batch_size = Histogram(BATCH_SIZE_BUCKETS)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, rows):
+        """Queues a (k, features) array; returns a Future of k predictions."""
+        future = Future()
+        self._queue.put((rows, future, time.perf_counter()))
+        return future
+
+    def _collect(self):
+        """Blocks for one request, then gathers more until the batch is full or the wait is over."""
+        batch = [self._queue.get()]
+        rows = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while rows < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch, rows
+
+    def _run(self):
+        while True:
+            batch, rows = self._collect()
+            try:
+                predictions = predict(np.vstack([item[0] for item in batch]), self.coef, self.intercept)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            self.batch_size.record(rows)
+            done = time.perf_counter()
+            start = 0
+            for request_rows, future, queued in batch:
+                future.set_result(predictions[start:start + len(request_rows)].tolist())
+                start += len(request_rows)
+                self.latency_ms.record((done - queued) * 1000)
+
+
+def parse_rows(body):
+    """Turns a request body into a (k, features) float array."""
+    payload = json.loads(body)
+    if isinstance(payload, dict) and "rows" in payload:
+        rows = payload["rows"]
+    elif isinstance(payload, dict):
+        rows = [[payload[name] for name in FEATURES]]
+    else:
+        rows = payload
+    X = np.asarray(rows, dtype=np.float64)
+    if X.ndim != 2 or X.shape[1] != len(FEATURES) or X.shape[0] == 0:
+        raise ValueError(f"expected rows of {len(FEATURES)} values ({', '.join(FEATURES)})")
+    return X
+
+
+def make_handler(batcher):
+    class PredictionHandler(BaseHTTPRequestHandler):
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if self.path != "/predict":
+                return self._reply(404, {"error": "not found"})
+            try:
+                X = parse_rows(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            except (ValueError, KeyError, TypeError) as e:
+                return self._reply(400, {"error": str(e)})
+            self._reply(200, {"predictions": batcher.submit(X).result()})
+
+        def do_GET(self):
+            if self.path != "/metrics":
+                return self._reply(404, {"error": "not found"})
+            self._reply(200, {"latency_ms": batcher.latency_ms.snapshot(),
+                              "batch_size": batcher.batch_size.snapshot()})
+
+        def log_message(self, format, *args):
+            pass  # keep the hot path quiet
+
+    return PredictionHandler
+
+
+def serve(model_path, host="127.0.0.1", port=8765, max_batch=256, max_wait_ms=2.0):
+    """Starts the server; returns it so callers can shut it down."""
+    coef, intercept = load_model(model_path)
+    batcher = MicroBatcher(coef, intercept, max_batch, max_wait_ms)
+    server = ThreadingHTTPServer((host, port), make_handler(batcher))
+    server.daemon_threads = True
+    server.batcher = batcher
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve house price predictions over HTTP.")
+    parser.add_argument("model", help="model artifact (.npz)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-batch", type=int, default=256, help="rows per batch")
+    parser.add_argument("--max-wait-ms", type=float, default=2.0, help="longest wait to fill a batch")
+    args = parser.parse_args(argv)
+
+    server = serve(args.model, args.host, args.port, args.max_batch, args.max_wait_ms)
+    print(f"Serving predictions on http://{args.host}:{server.server_port}/predict")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""Bulk QR code generation from a manifest file.
+
+Reads a CSV or JSONL manifest of jobs and renders them across a process
+pool with the same ``qrcode.QRCode`` setup as QRCODE generator.py. Each
+worker saves its image as soon as it is done, the manifest is read lazily
+and only a bounded number of jobs is in flight at once, so memory stays
+flat for manifests of any size. A throughput and failure summary is
+printed at the end.
+
+With ``--cache DIR`` images are served from a content-addressed cache
+(see qr_cache.py), so reprints of known payloads become file copies (or
+hard links with ``--cache-link``).
+
+Images are drawn by the one-step renderers in qr_render.py; an ``output``
+ending in ``.svg`` gets a vector image, anything else a bitmap.
+
+Manifest columns / keys: ``payload`` and ``output`` (required), plus the
+optional ``version``, ``box_size``, ``border``, ``error_correction``
+(L/M/Q/H), ``fill_color`` and ``back_color``.
+
+Usage:
+    python qr_batch.py labels.csv
+    python qr_batch.py labels.jsonl --workers 8
+    python qr_batch.py labels.csv --cache ~/.cache/qr --cache-mb 256
+    python qr_batch.py labels.csv --cache ~/.cache/qr --cache-link
+"""
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import qrcode
+
+from qr_cache import QRCache
+from qr_render import check_color, save_qr
+
+DEFAULTS = {
+    "version": 1,
+    "box_size": 10,
+    "border": 3,
+    "error_correction": "M",
+    "fill_color": "black",
+    "back_color": "white",
+}
+INT_OPTIONS = ("version", "box_size", "border")
+EVICT_EVERY = 1000  # completed jobs between cache size checks
+ERROR_CORRECTION = {
+    "L": qrcode.constants.ERROR_CORRECT_L,
+    "M": qrcode.constants.ERROR_CORRECT_M,
+    "Q": qrcode.constants.ERROR_CORRECT_Q,
+    "H": qrcode.constants.ERROR_CORRECT_H,
+}
+
+
+def job_options(job):
+    """Returns the rendering options of a job, with defaults filled in."""
+    options = dict(DEFAULTS)
+    for key in DEFAULTS:
+        value = job.get(key)
+        if value not in (None, ""):
+            options[key] = int(value) if key in INT_OPTIONS else str(value)
+    if not 1 <= options["version"] <= 40:
+        raise ValueError("version must be between 1 and 40")
+    if options["box_size"] < 1 or options["border"] < 0:
+        raise ValueError("box_size must be positive and border not negative")
+    options["error_correction"] = options["error_correction"].upper()
+    if options["error_correction"] not in ERROR_CORRECTION:
+        raise ValueError(f"error_correction must be one of {', '.join(ERROR_CORRECTION)}")
+    for key in ("fill_color", "back_color"):
+        check_color(options[key])
+    return options
+
+
+def build_qr(payload, options):
+    """Builds the fitted QRCode for a payload."""
+    features = qrcode.QRCode(version=options["version"], box_size=options["box_size"],
+                             border=options["border"],
+                             error_correction=ERROR_CORRECTION[options["error_correction"]])
+    features.add_data(payload)
+    features.make(fit=True)
+    return features
+
+
+def render_to_file(payload, output, options):
+    """Renders one QR code and saves it to ``output`` (PNG, SVG, ...).
+
+    The image is written under a temporary name and renamed into place, so
+    an existing ``output`` (possibly hard-linked to a cache entry) is
+    replaced, never written through.
+    """
+    features = build_qr(payload, options)
+    root, ext = os.path.splitext(output)
+    temp = f"{root}.{os.getpid()}.tmp{ext}"  # keeps the extension that picks the format
+    try:
+        save_qr(features, temp, options["box_size"], options["fill_color"], options["back_color"])
+        os.replace(temp, output)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+
+_caches = {}  # per worker process, by directory
+
+
+def run_job(job, cache_dir=None, link=False):
+    """Worker entry point: returns (output, error message or None, cache hit)."""
+    output = None
+    try:
+        if not isinstance(job, dict):
+            raise ValueError(f"job must be an object, not {type(job).__name__}")
+        output = job.get("output")
+        if not job.get("payload") or not output:
+            raise ValueError("payload and output are required")
+        directory = os.path.dirname(output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        payload, options = job["payload"], job_options(job)
+        if cache_dir is None:
+            render_to_file(payload, output, options)
+            return output, None, False
+        cache = _caches.get(cache_dir) or _caches.setdefault(cache_dir, QRCache(cache_dir, link=link))
+        hit = cache.get_or_render(payload, options, output,
+                                  lambda path: render_to_file(payload, path, options))
+        return output, None, hit
+    except Exception as e:
+        return output, str(e), False
+
+
+def read_manifest(path):
+    """Yields (where, job, error) from a CSV (with header) or JSONL manifest.
+
+    ``where`` is "line N". A line that is not a job object comes with ``job``
+    None and the reason in ``error``, so one bad line does not stop a run.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if str(path).endswith((".jsonl", ".json")):
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    job = json.loads(line)
+                except ValueError as e:
+                    yield f"line {number}", None, f"invalid JSON: {e}"
+                    continue
+                if isinstance(job, dict):
+                    yield f"line {number}", job, None
+                else:
+                    yield f"line {number}", None, f"expected an object, got {type(job).__name__}"
+        else:
+            reader = csv.DictReader(f)
+            for job in reader:
+                yield f"line {reader.line_num}", job, None
+
+
+class BatchReport:
+    """Counts finished jobs, failures and cache hits."""
+
+    def __init__(self):
+        self.done = 0
+        self.hits = 0
+        self.failures = []
+        self.seconds = 0.0
+
+    def failed(self, where, error):
+        self.done += 1
+        self.failures.append((where, error))
+
+    def collect(self, finished):
+        for future in finished:
+            output, error, hit = future.result()
+            self.done += 1
+            self.hits += hit
+            if error:
+                self.failures.append((output, error))
+
+
+def run_manifest(path, workers=None, max_in_flight=None, cache=None):
+    """Renders every job in a manifest and returns a BatchReport.
+
+    ``cache`` is an optional QRCache shared (through its directory) with
+    the workers; the parent keeps it within its size budget.
+    """
+    workers = workers or os.cpu_count()
+    max_in_flight = max_in_flight or workers * 4
+    cache_dir = cache.directory if cache else None
+    link = cache.link if cache else False
+    report = BatchReport()
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for where, job, error in read_manifest(path):
+            if error:
+                report.failed(where, error)
+                continue
+            pending.add(pool.submit(run_job, job, cache_dir, link))
+            if len(pending) >= max_in_flight:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                before = report.done
+                report.collect(finished)
+                if cache and before // EVICT_EVERY != report.done // EVICT_EVERY:
+                    cache.evict()
+        finished, _ = wait(pending)
+        report.collect(finished)
+    if cache:
+        cache.evict()
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate QR codes in bulk from a manifest.")
+    parser.add_argument("manifest", help="CSV or JSONL file of jobs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--max-in-flight", type=int, help="jobs queued at once (default: 4 per worker)")
+    parser.add_argument("--cache", metavar="DIR", help="content-addressed image cache directory")
+    parser.add_argument("--cache-mb", type=float, default=512, help="cache size budget in MiB")
+    parser.add_argument("--cache-link", action="store_true",
+                        help="hard-link cache hits to their outputs instead of copying them")
+    args = parser.parse_args(argv)
+
+    cache = (QRCache(args.cache, int(args.cache_mb * 1024 * 1024), link=args.cache_link)
+             if args.cache else None)
+    report = run_manifest(args.manifest, args.workers, args.max_in_flight, cache)
+    done, seconds = report.done, report.seconds
+    print(f"✅ Generated {done - len(report.failures)} of {done} QR codes in {seconds:.2f}s "
+          f"({done / seconds if seconds else 0:.1f} codes/s)")
+    if cache:
+        print(f"📦 Cache: {report.hits} hits, {done - report.hits - len(report.failures)} misses")
+    for output, error in report.failures:
+        print(f"❌ {output}: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Content-addressed on-disk cache for generated QR images.
+
+Images are stored under a SHA-256 of everything that affects the output
+(payload, version, error correction, box size, border, colours and file
+format). A cache hit is served by copying the stored image to the
+requested path instead of encoding the QR code again. With ``link=True``
+the output is hard-linked to the entry instead (copied when a link is not
+possible); a linked output shares the entry's file, so only do that when
+nothing writes to outputs in place (qr_batch.py always replaces them).
+
+Entries are kept within a size budget by evicting the least recently used
+files; each hit refreshes an entry's modification time, so the file system
+itself records recency and several worker processes can share one cache.
+"""
+import hashlib
+import json
+import os
+import shutil
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def cache_key(payload, options, fmt):
+    """Returns the content address of one rendered image."""
+    material = json.dumps({"payload": payload, "format": fmt.lower(), **options}, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class QRCache:
+    """Size-bounded LRU cache of rendered images in a directory."""
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, link=False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.link = link
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key, fmt):
+        return os.path.join(self.directory, key[:2], f"{key}.{fmt.lower()}")
+
+    def fetch(self, key, fmt, output):
+        """Places a cached image at ``output``; returns False on a miss."""
+        entry = self.path_for(key, fmt)
+        try:
+            os.utime(entry)  # mark as recently used
+            _place(entry, output, self.link)
+        except FileNotFoundError:  # absent, or evicted just now
+            self.misses += 1
+            return False
+        self.hits += 1
+        return True
+
+    def store(self, key, fmt, output, write):
+        """Writes a new entry with ``write(path)`` and places it at ``output``."""
+        entry = self.path_for(key, fmt)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        temp = f"{entry}.{os.getpid()}.tmp.{fmt.lower()}"
+        write(temp)
+        os.replace(temp, entry)  # atomic, so readers never see half a file
+        _place(entry, output, self.link)
+
+    def get_or_render(self, payload, options, output, write):
+        """Serves ``output`` from the cache, rendering it with ``write`` on a miss.
+
+        Returns True on a hit.
+        """
+        fmt = os.path.splitext(output)[1].lstrip(".") or "png"
+        key = cache_key(payload, options, fmt)
+        if self.fetch(key, fmt, output):
+            return True
+        self.store(key, fmt, output, write)
+        return False
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits its budget.
+
+        Returns the number of entries removed.
+        """
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if ".tmp" in name:
+                    continue  # still being written
+                path = os.path.join(root, name)
+                try:
+                    info = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, path))
+                total += info.st_size
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self):
+        """Returns hit/miss counters for this process."""
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0}
+
+
+def _place(entry, output, link=False):
+    """Copies (or hard-links) ``entry`` to ``output``, replacing it atomically."""
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp = f"{output}.{os.getpid()}.tmp"
+    if link:
+        try:
+            os.link(entry, temp)
+            os.replace(temp, output)
+            return
+        except FileNotFoundError:
+            raise
+        except OSError:  # e.g. another file system
+            pass
+    shutil.copyfile(entry, temp)
+    os.replace(temp, output)
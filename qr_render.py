@@ -0,0 +1,191 @@
+"""Direct NumPy bitmap and SVG renderers for QR codes.
+
+``features.make_image()`` goes through qrcode's PIL image factory, which
+draws every dark module as its own rectangle. These renderers take the
+module matrix from a fitted ``qrcode.QRCode`` instead and build the whole
+image in one step:
+
+* PNG (or any raster format PIL can write): the boolean matrix is scaled
+  up with ``np.repeat`` and encoded once.
+* SVG: each horizontal run of dark modules becomes one segment of a single
+  merged ``<path>``, instead of one ``<rect>`` per module.
+
+Run ``python qr_render.py --bench`` to compare them with the PIL path.
+"""
+import argparse
+import io
+import time
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
+from PIL import Image, ImageColor
+
+
+def module_matrix(features):
+    """Returns the module matrix of a fitted QRCode (border included), True = dark."""
+    return np.array(features.get_matrix(), dtype=bool)
+
+
+def check_color(color):
+    """Returns ``color`` if PIL understands it (or it is "transparent"); raises ValueError."""
+    color = str(color)
+    if color.lower() != "transparent":
+        ImageColor.getrgb(color)  # ValueError for anything else
+    return color
+
+
+def scale_matrix(matrix, box_size):
+    """Scales each module up to a ``box_size`` x ``box_size`` pixel block."""
+    return np.repeat(np.repeat(matrix, box_size, axis=0), box_size, axis=1)
+
+
+def bitmap_image(matrix, box_size, fill_color="black", back_color="white"):
+    """Builds a PIL image of the QR code in one step from the module matrix."""
+    pixels = scale_matrix(matrix, box_size)
+    if str(fill_color).lower() == "black" and str(back_color).lower() == "white":
+        return Image.fromarray(~pixels)  # 1-bit, like qrcode's PIL factory
+    transparent = str(back_color).lower() == "transparent"
+    image = Image.fromarray(pixels.astype(np.uint8), mode="P")
+    back = (255, 255, 255) if transparent else ImageColor.getrgb(back_color)[:3]
+    image.putpalette(list(back) + list(ImageColor.getrgb(fill_color)[:3]))
+    if transparent:
+        image.info["transparency"] = 0
+    return image
+
+
+def save_bitmap(matrix, box_size, output, fill_color="black", back_color="white", format=None):
+    """Writes the QR code as PNG (or any raster format PIL can write)."""
+    bitmap_image(matrix, box_size, fill_color, back_color).save(output, format=format)
+
+
+def svg_path_data(matrix):
+    """Returns SVG path data covering every dark module, in module units.
+
+    Each horizontal run of dark modules becomes one rectangle segment.
+    """
+    padded = np.zeros((matrix.shape[0], matrix.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = matrix
+    edges = np.diff(padded, axis=1)
+    segments = []
+    for y in range(matrix.shape[0]):
+        starts = np.flatnonzero(edges[y] == 1)
+        stops = np.flatnonzero(edges[y] == -1)
+        for x, stop in zip(starts.tolist(), stops.tolist()):
+            segments.append(f"M{x} {y}h{stop - x}v1h-{stop - x}z")
+    return "".join(segments)
+
+
+def svg_document(matrix, box_size, fill_color="black", back_color="white"):
+    """Builds the SVG document for a QR code as a string.
+
+    Colours must be valid (see check_color); they are escaped as attributes too.
+    """
+    fill_color, back_color = check_color(fill_color), check_color(back_color)
+    size = matrix.shape[0]
+    pixels = size * box_size
+    background = "" if back_color.lower() == "transparent" else (
+        f'<rect width="{size}" height="{size}" fill={quoteattr(back_color)}/>')
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{pixels}" height="{pixels}" '
+        f'viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'{background}<path fill={quoteattr(fill_color)} d="{svg_path_data(matrix)}"/></svg>\n'
+    )
+
+
+def save_svg(matrix, box_size, output, fill_color="black", back_color="white"):
+    """Writes the QR code as an SVG file (a path or a binary stream)."""
+    document = svg_document(matrix, box_size, fill_color, back_color).encode("utf-8")
+    if hasattr(output, "write"):
+        output.write(document)
+    else:
+        with open(output, "wb") as f:
+            f.write(document)
+
+
+def save_qr(features, output, box_size, fill_color="black", back_color="white"):
+    """Renders a fitted QRCode to ``output``, picking the renderer from its extension."""
+    matrix = module_matrix(features)
+    if str(output).lower().endswith(".svg"):
+        save_svg(matrix, box_size, output, fill_color, back_color)
+    else:
+        save_bitmap(matrix, box_size, output, fill_color, back_color)
+
+
+def qr_bytes(features, fmt, box_size, fill_color="black", back_color="white"):
+    """Renders a fitted QRCode to encoded bytes in ``fmt`` ("png", "svg", ...)."""
+    matrix = module_matrix(features)
+    if fmt.lower() == "svg":
+        return svg_document(matrix, box_size, fill_color, back_color).encode("utf-8")
+    buffer = io.BytesIO()
+    save_bitmap(matrix, box_size, buffer, fill_color, back_color, format=fmt.upper())
+    return buffer.getvalue()
+
+
+# --- Benchmark ---
+def benchmark(payload="https://example.com/products/1234567890", box_sizes=(10, 40), repeat=50):
+    """Times the PIL factory against the NumPy PNG and merged-path SVG renderers.
+
+    Returns {box_size: {renderer: milliseconds per image}}.
+    """
+    import qrcode
+    import qrcode.image.svg
+
+    features = qrcode.QRCode(version=1, border=3)
+    features.add_data(payload)
+    features.make(fit=True)
+
+    results = {}
+    for box_size in box_sizes:
+        features.box_size = box_size
+
+        def pil_png():
+            buffer = io.BytesIO()
+            features.make_image(fill_color="black", back_color="white").save(buffer)
+            return buffer
+
+        def pil_svg():
+            buffer = io.BytesIO()
+            features.make_image(image_factory=qrcode.image.svg.SvgImage).save(buffer)
+            return buffer
+
+        def numpy_png():
+            buffer = io.BytesIO()
+            save_bitmap(module_matrix(features), box_size, buffer, format="PNG")
+            return buffer
+
+        def merged_svg():
+            buffer = io.BytesIO()
+            save_svg(module_matrix(features), box_size, buffer)
+            return buffer
+
+        # Both raster paths must produce the same pixels.
+        reference = np.array(Image.open(pil_png()))
+        assert np.array_equal(reference, np.array(Image.open(numpy_png()))), "PNG output differs"
+
+        timings = {}
+        for name, render in (("pil_png", pil_png), ("numpy_png", numpy_png),
+                             ("pil_svg_rects", pil_svg), ("merged_path_svg", merged_svg)):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                render()
+            timings[name] = (time.perf_counter() - start) / repeat * 1000
+        results[box_size] = timings
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="QR rendering backends.")
+    parser.add_argument("--bench", action="store_true", help="compare renderers against the PIL path")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args(argv)
+    if args.bench:
+        for box_size, timings in benchmark(repeat=args.repeat).items():
+            print(f"📏 box_size={box_size}")
+            for name, ms in timings.items():
+                print(f"   {name:<16} {ms:8.3f} ms/image ({timings['pil_png'] / ms:5.1f}x vs pil_png)")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
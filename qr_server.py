@@ -0,0 +1,254 @@
+"""Local QR rendering microservice with an in-memory LRU and strong ETags.
+
+``GET /qr?payload=...`` returns a PNG (or ``&format=svg``) built with the
+same QRCode setup as QRCODE generator.py; the manifest options of
+qr_batch.py (``version``, ``box_size``, ``border``, ``error_correction``,
+``fill_color``, ``back_color``) are accepted as query parameters. Invalid
+options, and images wider than MAX_PIXELS, get a 400 before any rendering.
+
+Recent renders are kept in a byte-bounded in-memory LRU. Every response
+carries a strong ETag derived from the content address of the request (see
+qr_cache.cache_key), so a client or proxy sending ``If-None-Match`` gets a
+304 without anything being rendered or even looked up. ``GET /stats``
+reports cache hits and misses.
+
+Usage:
+    python qr_server.py serve --port 8080
+    python qr_server.py loadtest --url http://127.0.0.1:8080 --threads 8 --requests 2000
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from qr_batch import DEFAULTS, build_qr, job_options
+from qr_cache import cache_key
+from qr_render import qr_bytes
+
+CONTENT_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+MAX_AGE = 86400
+# Requests come from web pages, so image sizes are capped before rendering.
+MAX_BOX_SIZE = 100
+MAX_BORDER = 50
+MAX_PIXELS = 4096  # width (= height) of the rendered image
+
+
+class RenderCache:
+    """Thread-safe LRU of rendered images, bounded by total bytes."""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = body
+            self.bytes += len(body)
+            while self.bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"entries": len(self._entries), "bytes": self.bytes,
+                    "hits": self.hits, "misses": self.misses,
+                    "hit_ratio": self.hits / lookups if lookups else 0.0}
+
+
+def parse_request(query):
+    """Returns (payload, options, format) from a query string."""
+    params = {key: values[-1] for key, values in parse_qs(query).items()}
+    payload = params.get("payload")
+    if not payload:
+        raise ValueError("payload is required")
+    fmt = params.get("format", "png").lower()
+    if fmt not in CONTENT_TYPES:
+        raise ValueError(f"format must be one of {', '.join(CONTENT_TYPES)}")
+    options = job_options({key: params[key] for key in DEFAULTS if key in params})
+    if options["box_size"] > MAX_BOX_SIZE or options["border"] > MAX_BORDER:
+        raise ValueError(f"box_size must be at most {MAX_BOX_SIZE} and border at most {MAX_BORDER}")
+    return payload, options, fmt
+
+
+def check_size(features, options):
+    """Raises ValueError if the fitted code would render wider than MAX_PIXELS."""
+    pixels = (features.modules_count + 2 * options["border"]) * options["box_size"]
+    if pixels > MAX_PIXELS:
+        raise ValueError(f"image would be {pixels}px wide (at most {MAX_PIXELS}px)")
+
+
+def make_handler(cache):
+    class QRHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+        disable_nagle_algorithm = True  # headers and body are separate writes
+
+        def _send(self, status, body=b"", headers=()):
+            self.send_response(status)
+            for name, value in headers:
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body and self.command != "HEAD":
+                self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path == "/stats":
+                body = json.dumps(cache.stats()).encode()
+                return self._send(200, body, [("Content-Type", "application/json")])
+            if url.path != "/qr":
+                return self._send(404, b"not found")
+            try:
+                payload, options, fmt = parse_request(url.query)
+            except ValueError as e:
+                return self._send(400, str(e).encode())
+
+            key = cache_key(payload, options, fmt)
+            etag = f'"{key}"'
+            headers = [("ETag", etag), ("Cache-Control", f"public, max-age={MAX_AGE}")]
+            if etag in (tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")):
+                return self._send(304, headers=headers)
+
+            body = cache.get(key)
+            if body is None:
+                try:
+                    features = build_qr(payload, options)
+                    check_size(features, options)
+                    body = qr_bytes(features, fmt, options["box_size"],
+                                    options["fill_color"], options["back_color"])
+                except ValueError as e:  # e.g. an unknown colour or version
+                    return self._send(400, str(e).encode())
+                cache.put(key, body)
+            self._send(200, body, [("Content-Type", CONTENT_TYPES[fmt])] + headers)
+
+        do_HEAD = do_GET
+
+        def log_message(self, format, *args):
+            pass  # keep the hot path quiet
+
+    return QRHandler
+
+
+def serve(host="127.0.0.1", port=8080, cache_bytes=DEFAULT_CACHE_BYTES):
+    """Creates the server; call serve_forever() on the result."""
+    cache = RenderCache(cache_bytes)
+    server = ThreadingHTTPServer((host, port), make_handler(cache))
+    server.daemon_threads = True
+    server.cache = cache
+    return server
+
+
+# --- Load test ---
+def loadtest(url, threads=8, requests=2000, distinct=100, revalidate=0.0):
+    """Hammers a running server and returns throughput and latency figures.
+
+    Requests cycle through ``distinct`` payloads, so the LRU sees repeats;
+    a ``revalidate`` fraction of requests resend the ETag they last saw.
+    """
+    target = urlsplit(url)
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def client(worker):
+        conn = http.client.HTTPConnection(target.hostname, target.port)
+        etags = {}
+        mine = []
+        codes = {}
+        for i in range(worker, requests, threads):
+            n = i % distinct
+            path = "/qr?" + urlencode({"payload": f"https://example.com/products/{n}"})
+            headers = {}
+            if n in etags and (i * 7919 % 1000) / 1000 < revalidate:
+                headers["If-None-Match"] = etags[n]
+            start = time.perf_counter()
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            mine.append(time.perf_counter() - start)
+            codes[response.status] = codes.get(response.status, 0) + 1
+            if response.getheader("ETag"):
+                etags[n] = response.getheader("ETag")
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            for code, count in codes.items():
+                statuses[code] = statuses.get(code, 0) + count
+
+    workers = [threading.Thread(target=client, args=(w,)) for w in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000
+
+    return {"requests": len(latencies), "seconds": elapsed,
+            "requests_per_second": len(latencies) / elapsed,
+            "p50_ms": percentile(50), "p99_ms": percentile(99), "statuses": statuses}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="QR rendering microservice.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_cmd = commands.add_parser("serve", help="run the HTTP endpoint")
+    serve_cmd.add_argument("--host", default="127.0.0.1")
+    serve_cmd.add_argument("--port", type=int, default=8080)
+    serve_cmd.add_argument("--cache-mb", type=float, default=64)
+
+    load_cmd = commands.add_parser("loadtest", help="measure a running server")
+    load_cmd.add_argument("--url", default="http://127.0.0.1:8080")
+    load_cmd.add_argument("--threads", type=int, default=8)
+    load_cmd.add_argument("--requests", type=int, default=2000)
+    load_cmd.add_argument("--distinct", type=int, default=100, help="distinct payloads")
+    load_cmd.add_argument("--revalidate", type=float, default=0.0,
+                          help="fraction of requests sent with If-None-Match")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        server = serve(args.host, args.port, int(args.cache_mb * 1024 * 1024))
+        print(f"Serving QR codes on http://{args.host}:{server.server_port}/qr?payload=...")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    else:
+        result = loadtest(args.url, args.threads, args.requests, args.distinct, args.revalidate)
+        print(f"⚡ {result['requests']} requests in {result['seconds']:.2f}s "
+              f"= {result['requests_per_second']:.0f} req/s")
+        print(f"⏱️ p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms")
+        print(f"📊 Status codes: {result['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
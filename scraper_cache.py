@@ -0,0 +1,152 @@
+"""Disk-backed HTTP response cache for quote pages.
+
+Bodies are stored gzip-compressed under a SHA-256 of the URL, next to a
+small JSON record of the ETag, Last-Modified and fetch time. Within the TTL
+a page is served straight from disk; after that the fetcher revalidates it
+with a conditional GET and a ``304 Not Modified`` is answered from the
+cache, so only changed pages are downloaded in full.
+
+As in qr_cache.py, every use refreshes an entry's modification time and
+evict() removes least recently used entries until the cache fits its size
+budget. Writes go through a temporary file and os.replace, so several
+processes can share one directory.
+"""
+import gzip
+import hashlib
+import json
+import os
+import time
+from collections import namedtuple
+
+DEFAULT_TTL = 60.0
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+CachedResponse = namedtuple("CachedResponse", "url etag last_modified fetched body_path")
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of HTTP response bodies in a directory."""
+
+    def __init__(self, directory, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0          # served without touching the network
+        self.revalidated = 0   # 304 answered from the cache
+        self.misses = 0        # downloaded in full
+        self.bytes_saved = 0   # uncompressed bytes not downloaded
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directory, key[:2], key)
+        return f"{base}.json", f"{base}.gz"
+
+    def lookup(self, url):
+        """Returns (entry, fresh); entry is None when the URL is not cached."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None, False
+        if meta.get("url") != url or not os.path.exists(body_path):
+            return None, False
+        entry = CachedResponse(url, meta.get("etag"), meta.get("last_modified"),
+                               meta["fetched"], body_path)
+        return entry, time.time() - entry.fetched < self.ttl
+
+    def conditional_headers(self, entry):
+        """Request headers that ask the server to revalidate ``entry``."""
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def load(self, entry):
+        """Reads a cached body, or returns None if it vanished."""
+        try:
+            with gzip.open(entry.body_path, "rb") as f:
+                body = f.read()
+            os.utime(entry.body_path)  # mark as recently used
+        except (FileNotFoundError, OSError, EOFError):
+            return None
+        return body
+
+    def hit(self, entry):
+        """Returns the body of a fresh entry (None if it could not be read)."""
+        body = self.load(entry)
+        if body is not None:
+            self.hits += 1
+            self.bytes_saved += len(body)
+        return body
+
+    def refresh(self, entry, headers):
+        """Handles a 304: restarts the TTL and returns the cached body."""
+        body = self.load(entry)
+        if body is None:
+            return None
+        self._write_meta(entry.url, headers.get("ETag") or entry.etag,
+                         headers.get("Last-Modified") or entry.last_modified)
+        self.revalidated += 1
+        self.bytes_saved += len(body)
+        return body
+
+    def store(self, url, body, headers):
+        """Caches a full 200 response."""
+        meta_path, body_path = self._paths(url)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        temp = f"{body_path}.{os.getpid()}.tmp"
+        with open(temp, "wb") as f:
+            f.write(gzip.compress(body, compresslevel=6))
+        os.replace(temp, body_path)
+        self._write_meta(url, headers.get("ETag"), headers.get("Last-Modified"))
+        self.misses += 1
+
+    def _write_meta(self, url, etag, last_modified):
+        meta_path, _ = self._paths(url)
+        temp = f"{meta_path}.{os.getpid()}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump({"url": url, "etag": etag, "last_modified": last_modified,
+                       "fetched": time.time()}, f)
+        os.replace(temp, meta_path)
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits its budget.
+
+        Returns the number of entries removed.
+        """
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".gz"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    info = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, path))
+                total += info.st_size
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            for victim in (path[:-len(".gz")] + ".json", path):
+                try:
+                    os.remove(victim)
+                except FileNotFoundError:
+                    pass
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self):
+        """Returns hit/revalidation/miss counters for this process."""
+        lookups = self.hits + self.revalidated + self.misses
+        return {"hits": self.hits, "revalidated": self.revalidated, "misses": self.misses,
+                "hit_ratio": (self.hits + self.revalidated) / lookups if lookups else 0.0,
+                "bytes_saved": self.bytes_saved}
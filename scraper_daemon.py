@@ -0,0 +1,178 @@
+"""Resident scrape scheduler with change detection.
+
+Instead of cron starting WebScraper.py (and importing pandas and bs4) on
+every tick, this process stays up and keeps one pooled HTTP session. During
+market hours it polls on ticks aligned to the open (09:15, 09:16, ... for a
+60 s interval) and sleeps through the close, nights and weekends.
+
+The last recorded price and change of every symbol is kept in memory. Only
+symbols that moved by at least ``threshold`` percent (of the price, or in
+points of the day's change) since they were last recorded are appended to
+the quote store and passed to the notifier, so slow drifts are still caught
+once they add up.
+
+Usage:
+    python scraper_daemon.py --interval 60 --threshold 0.25
+    python scraper_daemon.py --always --interval 5 --base-url http://127.0.0.1:8000/quote/{symbol}
+"""
+import argparse
+import asyncio
+from collections import namedtuple
+from datetime import datetime, time as clock, timedelta
+from zoneinfo import ZoneInfo
+
+from scraper_cache import ResponseCache
+from scraper_fetch import QUOTE_URL, STOCKS, QuoteFetcher, describe_error, read_symbols
+from scraper_store import DEFAULT_PATH, QuoteStore, parse_number
+
+Move = namedtuple("Move", "row price change previous")
+
+
+class MarketHours:
+    """Trading session of one exchange (NSE by default)."""
+
+    def __init__(self, open="09:15", close="15:30", tz="Asia/Kolkata", days=range(5)):
+        self.open = clock.fromisoformat(open)
+        self.close = clock.fromisoformat(close)
+        self.tz = ZoneInfo(tz)
+        self.days = set(days)  # Monday = 0
+
+    def now(self):
+        return datetime.now(self.tz)
+
+    def is_open(self, now):
+        return now.weekday() in self.days and self.open <= now.time() < self.close
+
+    def next_open(self, now):
+        day = now.date()
+        while True:
+            start = datetime.combine(day, self.open, self.tz)
+            if start > now and start.weekday() in self.days:
+                return start
+            day += timedelta(days=1)
+
+    def next_tick(self, now, interval):
+        """The next poll time: a multiple of ``interval`` seconds after today's open."""
+        if self.is_open(now):
+            start = datetime.combine(now.date(), self.open, self.tz)
+            ticks = int((now - start).total_seconds() // interval) + 1
+            tick = start + timedelta(seconds=ticks * interval)
+            if tick.time() < self.close:
+                return tick
+        return self.next_open(now)
+
+
+class AlwaysOpen(MarketHours):
+    """Polls around the clock, aligned to multiples of the interval."""
+
+    def __init__(self, tz="Asia/Kolkata"):
+        super().__init__("00:00", "23:59:59.999999", tz, range(7))
+
+
+def print_moves(moves):
+    """Default notifier."""
+    for move in moves:
+        if move.previous is None:
+            print(f"📌 {move.row['Company']}: {move.row['Price (INR)']} {move.row['Change (%)']}")
+        else:
+            print(f"📈 {move.row['Company']}: {move.previous[0]} -> {move.row['Price (INR)']} "
+                  f"{move.row['Change (%)']}")
+
+
+class ScrapeDaemon:
+    """Polls quotes and records only the symbols that moved."""
+
+    def __init__(self, stocks, store, fetcher=None, hours=None, interval=60.0,
+                 threshold=0.1, notify=print_moves):
+        self.stocks = stocks
+        self.store = store
+        self.fetcher = fetcher or QuoteFetcher()
+        self.hours = hours or MarketHours()
+        self.interval = interval
+        self.threshold = threshold
+        self.notify = notify
+        self.snapshot = {}  # symbol -> (price, change) as last recorded
+
+    def diff(self, rows):
+        """Returns a Move for every row that moved beyond the threshold, updating the snapshot."""
+        moves = []
+        for row in rows:
+            price, change = parse_number(row["Price (INR)"]), parse_number(row["Change (%)"])
+            if price is None:
+                continue
+            previous = self.snapshot.get(row["Symbol"])
+            if previous is not None:
+                old_price, old_change = previous
+                price_move = abs(price - old_price) / old_price * 100 if old_price else float("inf")
+                change_move = abs(change - old_change) if None not in (change, old_change) else 0.0
+                if max(price_move, change_move) < self.threshold:
+                    continue
+            self.snapshot[row["Symbol"]] = (price, change)
+            moves.append(Move(row, price, change, previous))
+        return moves
+
+    async def poll(self, session):
+        """Scrapes every symbol once; returns (moves, failures)."""
+        rows, failures = [], {}
+        async for name, row, error in self.fetcher.stream(self.stocks, session):
+            if row is None:
+                failures[name] = error
+            else:
+                rows.append(row)
+        moves = self.diff(rows)
+        if moves:
+            self.store.append([move.row for move in moves])
+            self.notify(moves)
+        return moves, failures
+
+    async def run(self, polls=None):
+        """Polls on the market-hours schedule, ``polls`` times or forever."""
+        async with self.fetcher.session() as session:
+            count = 0
+            while polls is None or count < polls:
+                now = self.hours.now()
+                if not self.hours.is_open(now):
+                    wake = self.hours.next_open(now)
+                    print(f"💤 Market closed; sleeping until {wake:%a %Y-%m-%d %H:%M %Z}")
+                    await asyncio.sleep((wake - now).total_seconds())
+                    continue
+                moves, failures = await self.poll(session)
+                for name, error in failures.items():
+                    print(f"Failed to fetch data for {name}: {describe_error(error)}")
+                count += 1
+                now = self.hours.now()
+                await asyncio.sleep(max(0.0, (self.hours.next_tick(now, self.interval) - now).total_seconds()))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resident stock scraper with change detection.")
+    parser.add_argument("--symbols", help="CSV of name,symbol (default: WebScraper.py's stocks)")
+    parser.add_argument("--base-url", default=QUOTE_URL, help="quote URL with a {symbol} placeholder")
+    parser.add_argument("--interval", type=float, default=60.0, help="seconds between polls")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="minimum move, in percent of price or points of change, to record")
+    parser.add_argument("--open", default="09:15")
+    parser.add_argument("--close", default="15:30")
+    parser.add_argument("--tz", default="Asia/Kolkata")
+    parser.add_argument("--always", action="store_true", help="ignore market hours")
+    parser.add_argument("--polls", type=int, help="stop after this many polls")
+    parser.add_argument("--db", default=DEFAULT_PATH)
+    parser.add_argument("--cache", metavar="DIR", help="revalidate pages through a response cache")
+    args = parser.parse_args(argv)
+
+    stocks = read_symbols(args.symbols) if args.symbols else STOCKS
+    hours = AlwaysOpen(args.tz) if args.always else MarketHours(args.open, args.close, args.tz)
+    # Polls are already spaced by the interval, so pages are always revalidated.
+    cache = ResponseCache(args.cache, ttl=0) if args.cache else None
+    with QuoteStore(args.db) as store:
+        daemon = ScrapeDaemon(stocks, store, QuoteFetcher(args.base_url, cache=cache), hours,
+                              args.interval, args.threshold)
+        print(f"🕒 Polling {len(stocks)} symbols every {args.interval:g}s (threshold {args.threshold:g}%)")
+        try:
+            asyncio.run(daemon.run(args.polls))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
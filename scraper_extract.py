@@ -0,0 +1,169 @@
+"""Pluggable price/change extractors for quote pages.
+
+An extractor is any callable that takes a page (``bytes`` or ``str``) and
+returns ``(price, change)`` as text, raising on failure.
+
+* ``soup_extract`` builds the full BeautifulSoup tree, as WebScraper.py did.
+* ``fast_extract`` scans the raw bytes for just the two ``fin-streamer``
+  elements and never builds a DOM. It raises ExtractionError whenever the
+  markup is not the simple shape it understands.
+* ``auto_extract`` tries the fast path and falls back to BeautifulSoup.
+
+Run ``python scraper_extract.py --bench`` to time the extractors on the saved
+quote pages in fixtures/quotes and check they agree (or pass your own
+pages: ``--bench page1.html page2.html``). The fixtures cover the cases the
+fast path must get right: script, style and comment decoys, nested markup,
+upper-case tags and attributes, entities and ``>`` inside quoted attributes.
+"""
+import argparse
+import glob
+import html
+import os
+import re
+import time
+
+from bs4 import BeautifulSoup
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "quotes")
+PRICE_FIELD = "regularMarketPrice"
+CHANGE_FIELD = "regularMarketChangePercent"
+
+
+class ExtractionError(ValueError):
+    """The page does not contain the expected fields."""
+
+
+def soup_extract(page):
+    """Returns (price, change) text using a full BeautifulSoup parse."""
+    soup = BeautifulSoup(page, "html.parser")
+    try:
+        price = soup.find("fin-streamer", {"data-field": PRICE_FIELD}).text
+        change = soup.find("fin-streamer", {"data-field": CHANGE_FIELD}).text
+    except AttributeError:
+        raise ExtractionError("fin-streamer fields not found") from None
+    return price, change
+
+
+_ATTRS = rb"(?:[^>\"']|\"[^\"]*\"|'[^']*')*?"  # quoted values may contain ">"
+
+
+def _element_pattern(field):
+    # <fin-streamer ... data-field="field" ...> inner </fin-streamer>
+    return re.compile(
+        rb"<(?i:fin-streamer)\b" + _ATTRS + rb"\s(?i:data-field)\s*=\s*([\"']?)"
+        + re.escape(field.encode()) + rb"\1(?=[\s/>])" + _ATTRS + rb">(.*?)</(?i:fin-streamer)\s*>",
+        re.DOTALL,
+    )
+
+
+_ELEMENTS = {field: _element_pattern(field) for field in (PRICE_FIELD, CHANGE_FIELD)}
+_TAG = re.compile(rb"<[^>]*>")
+# Comments and raw-text elements, whose contents are not markup.
+_OPAQUE = re.compile(rb"<!--.*?-->|<(script|style|textarea|title)\b.*?</\1\s*>",
+                     re.DOTALL | re.IGNORECASE)
+_COMPLEX = re.compile(rb"<(?:!|fin-streamer\b|script\b|style\b|textarea\b|title\b)",
+                      re.IGNORECASE)
+
+
+def _inner_text(page, field, opaque):
+    pattern = _ELEMENTS[field]
+    pos = 0
+    while True:
+        match = pattern.search(page, pos)
+        if match is None:
+            raise ExtractionError(f"{field} not found")
+        # A match inside a script or comment is not an element; look past it.
+        skip = next((end for start, end in opaque if start < match.start() < end), None)
+        if skip is None:
+            break
+        pos = skip
+    inner = match.group(2)
+    if _COMPLEX.search(inner):
+        # Nested fin-streamers, comments or scripts: leave it to a real parser.
+        raise ExtractionError(f"{field} has complex markup")
+    return html.unescape(_TAG.sub(b"", inner).decode("utf-8", "replace"))
+
+
+def fast_extract(page):
+    """Returns (price, change) text by scanning the raw page bytes."""
+    if isinstance(page, str):
+        page = page.encode("utf-8")
+    opaque = [block.span() for block in _OPAQUE.finditer(page)]
+    return _inner_text(page, PRICE_FIELD, opaque), _inner_text(page, CHANGE_FIELD, opaque)
+
+
+def chain(*extractors):
+    """Combines extractors: each is tried in turn until one succeeds."""
+    def extract(page):
+        error = None
+        for extractor in extractors:
+            try:
+                return extractor(page)
+            except Exception as e:
+                error = e
+        raise error
+    return extract
+
+
+auto_extract = chain(fast_extract, soup_extract)
+
+EXTRACTORS = {"auto": auto_extract, "fast": fast_extract, "soup": soup_extract}
+
+
+# --- Benchmark ---
+def fixture_pages(directory=FIXTURE_DIR):
+    """The saved quote pages, named ``<symbol>.html``."""
+    return sorted(glob.glob(os.path.join(directory, "*.html")))
+
+
+def benchmark(paths, repeat=20):
+    """Times the fast and BeautifulSoup extractors on saved pages.
+
+    Returns {path: {extractor: (milliseconds per page, result)}} and raises
+    AssertionError if the two disagree on any page.
+    """
+    results = {}
+    for path in paths:
+        with open(path, "rb") as f:
+            page = f.read()
+        timings = {}
+        for name in ("soup", "fast"):
+            extract = EXTRACTORS[name]
+            try:
+                result = extract(page)
+            except ExtractionError as e:
+                result = e
+            start = time.perf_counter()
+            for _ in range(repeat):
+                try:
+                    extract(page)
+                except ExtractionError:
+                    pass
+            timings[name] = ((time.perf_counter() - start) / repeat * 1000, result)
+        soup_result, fast_result = timings["soup"][1], timings["fast"][1]
+        if not isinstance(fast_result, ExtractionError):
+            assert fast_result == soup_result, f"{path}: fast {fast_result!r} != soup {soup_result!r}"
+        results[path] = timings
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Quote page extractors.")
+    parser.add_argument("--bench", nargs="*", metavar="HTML",
+                        help="benchmark on saved quote pages (default: fixtures/quotes)")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+    if args.bench is None:
+        return parser.print_help()
+    for path, timings in benchmark(args.bench or fixture_pages(), args.repeat).items():
+        soup_ms, result = timings["soup"]
+        fast_ms, fast_result = timings["fast"]
+        if isinstance(fast_result, ExtractionError):
+            print(f"{path}: fast path declined ({fast_result}); soup {soup_ms:.2f} ms")
+        else:
+            print(f"{path}: {result} - soup {soup_ms:.2f} ms, fast {fast_ms:.3f} ms "
+                  f"({soup_ms / fast_ms:.0f}x), outputs match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+"""Concurrent asyncio fetch engine for the stock scraper.
+
+Fetches quote pages through one pooled, keep-alive aiohttp session, with a
+per-host concurrency limit, a per-host token-bucket rate limit and a
+timeout on every request. Parsed rows are yielded as each page completes,
+in whatever order they finish. Pages are parsed by the extractors in
+scraper_extract.py (a raw byte scan with a BeautifulSoup fallback).
+
+To run it without the network, LocalQuoteServer serves the saved pages in
+fixtures/quotes (with ETags, and an optional delay per request):
+    server = LocalQuoteServer(delay=0.05).start()
+    QuoteFetcher(base_url=server.quote_url)
+
+Usage:
+    python scraper_fetch.py                      # the stocks from WebScraper.py
+    python scraper_fetch.py --symbols nse.csv --per-host 16 --rate 20
+    python scraper_fetch.py --extractor soup     # always build the full soup
+    python scraper_fetch.py --cache .quote_cache --ttl 60
+    python scraper_fetch.py --metrics --metrics-json stages.json --profile hot.prof
+    python scraper_fetch.py --local --delay 0.05   # fixture pages from a local stand-in
+"""
+import argparse
+import asyncio
+import csv
+import hashlib
+import os
+import threading
+import time
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+import aiohttp
+
+from scraper_cache import DEFAULT_TTL, ResponseCache
+from scraper_extract import EXTRACTORS, FIXTURE_DIR, auto_extract
+from scraper_metrics import Metrics
+
+QUOTE_URL = "https://finance.yahoo.com/quote/{symbol}"
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# List of stock symbols (same as WebScraper.py)
+STOCKS = {
+    "TCS": "TCS.NS",
+    "Reliance": "RELIANCE.NS",
+    "Infosys": "INFY.NS"
+}
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second with bursts of up to ``capacity``."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class QuoteFetcher:
+    """Fetches and parses quote pages concurrently."""
+
+    def __init__(self, base_url=QUOTE_URL, per_host=8, rate=10.0, burst=None,
+                 timeout=10.0, extract=auto_extract, cache=None, metrics=None):
+        self.base_url = base_url
+        self.per_host = per_host
+        self.rate = rate
+        self.burst = burst
+        self.timeout = timeout
+        self.extract = extract
+        self.cache = cache
+        self.metrics = metrics
+        self._buckets = {}
+        self._limits = {}
+
+    def _host_limits(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._limits:
+            self._limits[host] = asyncio.Semaphore(self.per_host)
+            self._buckets[host] = TokenBucket(self.rate, self.burst) if self.rate else None
+        return self._limits[host], self._buckets[host]
+
+    async def fetch_page(self, session, url, symbol=None):
+        """Downloads one page, honouring the host's concurrency and rate limits.
+
+        With a cache, fresh pages are read from disk and stale ones are
+        revalidated with a conditional GET.
+        """
+        loop = asyncio.get_running_loop()
+        entry = None
+        if self.cache:
+            entry, fresh = await loop.run_in_executor(None, self.cache.lookup, url)
+            if fresh:
+                body = await loop.run_in_executor(None, self.cache.hit, entry)
+                if body is not None:
+                    return body
+        headers = self.cache.conditional_headers(entry) if entry else None
+        limit, bucket = self._host_limits(url)
+        async with limit:
+            if bucket:
+                await bucket.acquire()
+            status, body, reply_headers = await self._get(session, url, headers, symbol)
+            if status == 304:
+                body = await loop.run_in_executor(None, self.cache.refresh, entry, reply_headers)
+                if body is not None:
+                    return body
+                # The entry was evicted meanwhile: fetch the page unconditionally.
+                status, body, reply_headers = await self._get(session, url, symbol=symbol)
+        if self.cache:
+            await loop.run_in_executor(None, self.cache.store, url, body, reply_headers)
+        return body  # extractors scan the raw bytes
+
+    async def _get(self, session, url, headers=None, symbol=None):
+        start = time.perf_counter()
+        async with session.get(url, headers=headers, trace_request_ctx={"symbol": symbol}) as response:
+            if not (response.status == 304 and headers):
+                response.raise_for_status()
+            body = await response.read()
+        if self.metrics:
+            self.metrics.record("download", time.perf_counter() - start, symbol)
+        return response.status, body, response.headers
+
+    def _parse(self, page, symbol):
+        if self.metrics is None:
+            return self.extract(page)
+        with self.metrics.timed("parse", symbol):
+            return self.extract(page)
+
+    async def fetch_row(self, session, name, symbol):
+        url = self.base_url.format(symbol=symbol)
+        page = await self.fetch_page(session, url, symbol)
+        # Parse off the event loop so in-flight downloads keep moving.
+        price, change = await asyncio.get_running_loop().run_in_executor(None, self._parse, page, symbol)
+        return {
+            "Company": name,
+            "Symbol": symbol,
+            "Price (INR)": price,
+            "Change (%)": change,
+        }
+
+    def session(self):
+        """A pooled keep-alive session sized for the per-host limit."""
+        connector = aiohttp.TCPConnector(limit=0, limit_per_host=self.per_host)
+        trace_configs = [self.metrics.trace_config()] if self.metrics else None
+        return aiohttp.ClientSession(connector=connector, headers=HEADERS, trace_configs=trace_configs,
+                                     timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+    async def stream(self, stocks, session=None):
+        """Yields (name, row, error) as each page completes; row is None on failure.
+
+        Pass a ``session`` to reuse its connections across calls.
+        """
+        async with nullcontext(session) if session else self.session() as session:
+            async def one(name, symbol):
+                try:
+                    return name, await self.fetch_row(session, name, symbol), None
+                except Exception as e:
+                    return name, None, e
+
+            tasks = [asyncio.create_task(one(name, symbol)) for name, symbol in stocks.items()]
+            try:
+                for task in asyncio.as_completed(tasks):
+                    yield await task
+            finally:
+                for task in tasks:
+                    task.cancel()
+                if self.cache:
+                    self.cache.evict()
+
+
+# --- Local quote stand-in ---
+class _QuoteHandler(BaseHTTPRequestHandler):
+    """Serves ``/quote/<symbol>`` from ``<symbol>.html`` in the fixture directory."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real site
+    disable_nagle_algorithm = True
+
+    def _send(self, status, body=b"", headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.count()
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        symbol = unquote(urlsplit(self.path).path.rpartition("/quote/")[2])
+        page = self.server.page(symbol)
+        if page is None:
+            return self._send(404, b"not found")
+        etag = f'"{hashlib.sha256(page).hexdigest()[:32]}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._send(304, headers=[("ETag", etag)])
+        self._send(200, page, [("Content-Type", "text/html; charset=utf-8"), ("ETag", etag)])
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalQuoteServer(ThreadingHTTPServer):
+    """Stand-in for the quote site serving saved pages, counting requests."""
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, directory=FIXTURE_DIR, delay=0.0):
+        super().__init__((host, port), _QuoteHandler)
+        self.directory = directory
+        self.delay = delay
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    @property
+    def quote_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/quote/{{symbol}}"
+
+    def symbols(self):
+        """{symbol: symbol} for every saved page, in the shape of STOCKS."""
+        return {name[:-5]: name[:-5] for name in sorted(os.listdir(self.directory))
+                if name.endswith(".html")}
+
+    def page(self, symbol):
+        path = os.path.join(self.directory, f"{symbol}.html")
+        if os.path.basename(path) != f"{symbol}.html" or not os.path.isfile(path):
+            return None  # unknown symbol, or one trying to leave the directory
+        with open(path, "rb") as f:
+            return f.read()
+
+    def count(self):
+        with self._lock:
+            self.requests += 1
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def describe_error(error):
+    """A short message for a fetch failure (timeouts have no text of their own)."""
+    return str(error) or type(error).__name__
+
+
+def fetch_rows(stocks, **options):
+    """Fetches every stock; returns (rows, {name: error}) in completion order."""
+    async def collect():
+        rows, failures = [], {}
+        async for name, row, error in QuoteFetcher(**options).stream(stocks):
+            if row is None:
+                failures[name] = error
+            else:
+                rows.append(row)
+        return rows, failures
+
+    return asyncio.run(collect())
+
+
+def print_metrics(metrics, json_path=None, profile_path=None, per_symbol=False):
+    """Prints the latency table, then writes the JSON and profile if asked."""
+    print(metrics.report(per_symbol))
+    if json_path:
+        metrics.export_json(json_path)
+        print(f"Metrics written to {json_path}")
+    if profile_path:
+        dumped = metrics.dump_profile(profile_path)
+        if dumped:
+            stage, listing = dumped
+            print(f"Profile of the hottest stage ({stage}) written to {profile_path}")
+            print(listing)
+
+
+def read_symbols(path):
+    """Reads ``name,symbol`` rows (header optional) into a dict."""
+    stocks = {}
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.reader(f):
+            if len(row) >= 2 and row[0].strip().lower() not in ("name", "company"):
+                stocks[row[0].strip()] = row[1].strip()
+    return stocks
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch stock quotes concurrently.")
+    parser.add_argument("--symbols", help="CSV of name,symbol (default: WebScraper.py's stocks)")
+    parser.add_argument("--base-url", default=QUOTE_URL, help="quote URL with a {symbol} placeholder")
+    parser.add_argument("--per-host", type=int, default=8, help="concurrent requests per host")
+    parser.add_argument("--rate", type=float, default=10.0, help="requests per second per host (0 = unlimited)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds per request")
+    parser.add_argument("--extractor", choices=EXTRACTORS, default="auto",
+                        help="fast byte scan, full BeautifulSoup parse, or fast with soup fallback")
+    parser.add_argument("--cache", metavar="DIR", help="keep responses in this directory and revalidate them")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL, help="seconds a cached page is used as is")
+    parser.add_argument("--cache-mb", type=float, default=256, help="cache size budget")
+    parser.add_argument("--local", action="store_true",
+                        help="fetch the fixture pages from a local stand-in server instead")
+    parser.add_argument("--port", type=int, default=8000, help="stand-in port (fixed, so cached URLs match)")
+    parser.add_argument("--delay", type=float, default=0.0, help="stand-in latency per request (s)")
+    parser.add_argument("--metrics", action="store_true", help="print per-stage latency percentiles")
+    parser.add_argument("--metrics-json", metavar="PATH", help="also write them as JSON")
+    parser.add_argument("--profile", metavar="PATH", help="dump a cProfile of the hottest stage")
+    args = parser.parse_args(argv)
+
+    server = LocalQuoteServer(port=args.port, delay=args.delay).start() if args.local else None
+    if server:
+        args.base_url = server.quote_url
+    stocks = read_symbols(args.symbols) if args.symbols else server.symbols() if server else STOCKS
+    cache = ResponseCache(args.cache, args.ttl, int(args.cache_mb * 1024 * 1024)) if args.cache else None
+    metrics = None
+    if args.metrics or args.metrics_json or args.profile:
+        metrics = Metrics(profile=bool(args.profile))
+
+    async def run():
+        fetcher = QuoteFetcher(args.base_url, args.per_host, args.rate, timeout=args.timeout,
+                               extract=EXTRACTORS[args.extractor], cache=cache, metrics=metrics)
+        async for name, row, error in fetcher.stream(stocks):
+            if row is None:
+                print(f"Failed to fetch data for {name}: {describe_error(error)}")
+            else:
+                print(row)
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    print(f"Fetched {len(stocks)} symbols in {time.perf_counter() - start:.2f}s")
+    if server:
+        print(f"Stand-in served {server.requests} requests")
+        server.shutdown()
+    if cache:
+        stats = cache.stats()
+        print(f"Cache: {stats['hits']} hits, {stats['revalidated']} revalidated, "
+              f"{stats['misses']} downloads ({stats['hit_ratio']:.0%} hit ratio)")
+    if metrics:
+        print_metrics(metrics, args.metrics_json, args.profile, per_symbol=True)
+
+
+if __name__ == "__main__":
+    main()
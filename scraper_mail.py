@@ -0,0 +1,412 @@
+"""Pooled, persistent SMTP delivery queue for scraper reports.
+
+Reports are written to an SQLite outbox and delivered by a background
+thread, so queuing one never blocks the scraper. The worker keeps a single
+authenticated SMTP connection open and sends every due message over it,
+reconnecting only when the server drops it. Failed sends are retried with
+exponential backoff, and permanent (5xx) rejections are marked failed.
+Messages still queued when the process exits are sent by the next run.
+
+Large attachments are gzip-compressed when that makes them noticeably
+smaller.
+
+``python scraper_mail.py bench`` starts an in-process SMTP stand-in and
+measures throughput for 1,000 reports, against one connection per message.
+
+Usage:
+    python scraper_mail.py bench --messages 1000
+    python scraper_mail.py status --outbox outbox.db
+"""
+import argparse
+import copy
+import gzip
+import multiprocessing
+import os
+import smtplib
+import socketserver
+import sqlite3
+import tempfile
+import threading
+import time
+from email.message import EmailMessage
+from email.utils import getaddresses
+
+DEFAULT_OUTBOX = "outbox.db"
+COMPRESS_OVER = 1024 * 1024  # bytes
+XLSX_TYPE = ("application", "vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+
+def report_message(sender, recipients, attachment_path, subject, body,
+                   mime_type=XLSX_TYPE, compress_over=COMPRESS_OVER):
+    """Builds a report email, gzip-compressing a large attachment when it helps."""
+    msg = EmailMessage()
+    msg["Subject"] = subject
+    msg["From"] = sender
+    msg["To"] = recipients if isinstance(recipients, str) else ", ".join(recipients)
+    msg.set_content(body)
+    with open(attachment_path, "rb") as f:
+        data = f.read()
+    name = os.path.basename(attachment_path)
+    if len(data) > compress_over:
+        packed = gzip.compress(data)
+        if len(packed) < len(data) * 0.9:
+            data, name, mime_type = packed, name + ".gz", ("application", "gzip")
+    msg.add_attachment(data, maintype=mime_type[0], subtype=mime_type[1], filename=name)
+    return msg
+
+
+class Outbox:
+    """Thread-safe persistent queue of outgoing messages."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS outbox (
+        id INTEGER PRIMARY KEY,
+        sender TEXT NOT NULL,
+        recipients TEXT NOT NULL,   -- comma separated
+        message BLOB NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',  -- queued, sent or failed
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt REAL NOT NULL,
+        error TEXT
+    );
+    CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt);
+    """
+
+    def __init__(self, path=DEFAULT_OUTBOX):
+        self.path = path
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")  # WAL commits still survive a crash
+        self.db.executescript(self.SCHEMA)
+        self._lock = threading.Lock()
+
+    def put(self, msg):
+        """Queues an EmailMessage; returns its id."""
+        recipients = [address for _, address in getaddresses(
+            [value for field in ("To", "Cc", "Bcc") for value in msg.get_all(field, [])]) if address]
+        if msg["Bcc"] is not None:
+            msg = copy.deepcopy(msg)
+            del msg["Bcc"]
+        with self._lock, self.db:
+            cursor = self.db.execute(
+                "INSERT INTO outbox (sender, recipients, message, next_attempt) VALUES (?, ?, ?, ?)",
+                (msg["From"], ",".join(recipients), msg.as_bytes(), time.time()))
+        return cursor.lastrowid
+
+    def due(self, limit=100):
+        """Returns [(id, sender, recipients, message bytes, attempts)] ready to send."""
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT id, sender, recipients, message, attempts FROM outbox "
+                "WHERE status = 'queued' AND next_attempt <= ? ORDER BY next_attempt LIMIT ?",
+                (time.time(), limit)).fetchall()
+        return [(id, sender, recipients.split(","), message, attempts)
+                for id, sender, recipients, message, attempts in rows]
+
+    def next_attempt(self):
+        """When the earliest queued message is due, or None if nothing is queued."""
+        with self._lock:
+            return self.db.execute(
+                "SELECT MIN(next_attempt) FROM outbox WHERE status = 'queued'").fetchone()[0]
+
+    def sent(self, id):
+        with self._lock, self.db:
+            # The body is no longer needed once delivered.
+            self.db.execute("UPDATE outbox SET status = 'sent', message = x'', error = NULL, "
+                            "attempts = attempts + 1 WHERE id = ?", (id,))
+
+    def retry(self, id, error, delay):
+        with self._lock, self.db:
+            self.db.execute("UPDATE outbox SET attempts = attempts + 1, next_attempt = ?, error = ? "
+                            "WHERE id = ?", (time.time() + delay, error, id))
+
+    def failed(self, id, error):
+        with self._lock, self.db:
+            self.db.execute("UPDATE outbox SET status = 'failed', attempts = attempts + 1, error = ? "
+                            "WHERE id = ?", (error, id))
+
+    def status(self, id):
+        """Returns (status, last error) of one message, or None if there is no such id."""
+        with self._lock:
+            return self.db.execute("SELECT status, error FROM outbox WHERE id = ?", (id,)).fetchone()
+
+    def counts(self):
+        """Returns {status: count}."""
+        with self._lock:
+            return dict(self.db.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status"))
+
+    def failures(self):
+        """Returns [(id, error)] of failed messages, newest first."""
+        with self._lock:
+            return self.db.execute(
+                "SELECT id, error FROM outbox WHERE status = 'failed' ORDER BY id DESC").fetchall()
+
+    def close(self):
+        self.db.close()
+
+
+class SMTPDelivery:
+    """Background worker that drains an Outbox over one reused SMTP connection."""
+
+    def __init__(self, outbox, host, port=465, username=None, password=None, use_ssl=True,
+                 starttls=False, max_attempts=5, backoff=2.0, max_backoff=300.0, idle_timeout=60.0,
+                 metrics=None):
+        self.outbox = outbox
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_ssl = use_ssl
+        self.starttls = starttls
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.idle_timeout = idle_timeout
+        self.metrics = metrics  # records the "smtp" stage (see scraper_metrics.py)
+        self.sent = 0
+        self.connections = 0
+        self._smtp = None
+        self._last_used = 0.0
+        self._wake = threading.Event()
+        self._stopping = False
+        self._drain = False
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="smtp-delivery", daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, msg):
+        """Queues a message for delivery and returns its outbox id at once (see Outbox.status)."""
+        id = self.outbox.put(msg)
+        self._wake.set()
+        return id
+
+    def stop(self, drain=True, timeout=None):
+        """Stops the worker, first sending everything that is due if ``drain``."""
+        self._drain = drain
+        self._stopping = True
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    # --- Connection ---
+    def _connection(self):
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self._disconnect()  # the server has probably dropped it by now
+        if self._smtp is None:
+            if self.use_ssl:
+                smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=30)
+            else:
+                smtp = smtplib.SMTP(self.host, self.port, timeout=30)
+                if self.starttls:
+                    smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            self._smtp = smtp
+            self.connections += 1
+        self._last_used = time.monotonic()
+        return self._smtp
+
+    def _disconnect(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                self._smtp.close()
+            self._smtp = None
+
+    # --- Worker ---
+    def _deliver(self, id, sender, recipients, message, attempts):
+        start = time.perf_counter()
+        try:
+            self._connection().sendmail(sender, recipients, message)
+        except smtplib.SMTPResponseException as e:
+            if e.smtp_code < 500:
+                self._disconnect()
+            self._failure(id, attempts, f"{e.smtp_code} {e.smtp_error!r}", permanent=e.smtp_code >= 500)
+        except smtplib.SMTPRecipientsRefused as e:
+            self._failure(id, attempts, f"recipients refused: {e.recipients}", permanent=True)
+        except (smtplib.SMTPException, OSError) as e:
+            self._disconnect()
+            self._failure(id, attempts, str(e) or type(e).__name__)
+        else:
+            self.outbox.sent(id)
+            self.sent += 1
+        finally:
+            if self.metrics:
+                self.metrics.record("smtp", time.perf_counter() - start)
+
+    def _failure(self, id, attempts, error, permanent=False):
+        if permanent or attempts + 1 >= self.max_attempts:
+            self.outbox.failed(id, error)
+        else:
+            self.outbox.retry(id, error, min(self.max_backoff, self.backoff * 2 ** attempts))
+
+    def _run(self):
+        try:
+            while True:
+                batch = self.outbox.due()
+                for row in batch:
+                    self._deliver(*row)
+                if batch:
+                    continue
+                if self._stopping:
+                    break
+                upcoming = self.outbox.next_attempt()
+                wait = self.idle_timeout if upcoming is None else max(0.0, upcoming - time.time())
+                self._wake.wait(wait)
+                self._wake.clear()
+                if self._stopping and not self._drain:
+                    break
+        finally:
+            self._disconnect()
+
+
+# --- Local SMTP stand-in ---
+class _SinkHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept mail from smtplib (no TLS)."""
+
+    def _reply(self, *lines):
+        self.wfile.write("".join(f"{line}\r\n" for line in lines).encode())
+
+    def handle(self):
+        self._reply("220 localhost SMTP stand-in")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            verb = line[:4].decode("ascii", "replace").upper()
+            if verb == "EHLO":
+                self._reply("250-localhost", "250-AUTH PLAIN LOGIN", "250 8BITMIME")
+            elif verb == "HELO":
+                self._reply("250 localhost")
+            elif verb == "AUTH":
+                self._reply("235 2.7.0 Authentication successful")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                size = 0
+                for chunk in iter(self.rfile.readline, b""):
+                    if chunk == b".\r\n":
+                        break
+                    size += len(chunk)
+                self.server.received(size)
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            elif verb in ("MAIL", "RCPT", "RSET", "NOOP"):
+                self._reply("250 OK")
+            else:
+                self._reply("502 Command not implemented")
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """SMTP sink that counts the messages it accepts.
+
+    ``counter`` may be a multiprocessing.Value to count from another process.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0, counter=None):
+        super().__init__((host, port), _SinkHandler)
+        self.counter = counter or multiprocessing.Value("q", 0, lock=True)
+        self.bytes = 0
+
+    @property
+    def messages(self):
+        return self.counter.value
+
+    def received(self, size):
+        with self.counter.get_lock():
+            self.counter.value += 1
+        self.bytes += size
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def _serve_sink(ports, counter):
+    server = LocalSMTPServer(counter=counter)
+    ports.put(server.server_address[1])
+    server.serve_forever()
+
+
+def benchmark(messages=1000, attachment_kb=16):
+    """Sends ``messages`` reports to a local stand-in, pooled and one connection each.
+
+    Returns {mode: messages per second}.
+    """
+    # The stand-in gets its own process so it does not compete for our GIL.
+    counter = multiprocessing.Value("q", 0, lock=True)
+    ports = multiprocessing.Queue()
+    sink = multiprocessing.Process(target=_serve_sink, args=(ports, counter), daemon=True)
+    sink.start()
+    host, port = "127.0.0.1", ports.get(timeout=10)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        attachment = os.path.join(tmp, "stock_report.xlsx")
+        with open(attachment, "wb") as f:
+            f.write(os.urandom(attachment_kb * 1024))
+        msg = report_message("bot@example.com", ["a@example.com", "b@example.com"], attachment,
+                             "📈 Daily Stock Market Report", "Attached is your report.")
+
+        # Baseline: what WebScraper.py did, once per message.
+        start = time.perf_counter()
+        for _ in range(messages):
+            with smtplib.SMTP(host, port) as smtp:
+                smtp.login("bot", "secret")
+                smtp.send_message(msg)
+        results["connection_per_message"] = messages / (time.perf_counter() - start)
+
+        outbox = Outbox(os.path.join(tmp, "outbox.db"))
+        delivery = SMTPDelivery(outbox, host, port, "bot", "secret", use_ssl=False)
+        before = counter.value
+        start = time.perf_counter()
+        delivery.start()
+        for _ in range(messages):
+            delivery.submit(msg)
+        queued = time.perf_counter() - start
+        delivery.stop(drain=True)
+        elapsed = time.perf_counter() - start
+        assert counter.value - before == messages, "not every message arrived"
+        assert outbox.counts() == {"sent": messages}
+        results["pooled_queue"] = messages / elapsed
+        results["enqueue_only"] = messages / queued
+        results["connections"] = delivery.connections
+        outbox.close()
+    sink.terminate()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scraper report delivery queue.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    bench_cmd = commands.add_parser("bench", help="measure throughput against a local SMTP stand-in")
+    bench_cmd.add_argument("--messages", type=int, default=1000)
+    bench_cmd.add_argument("--attachment-kb", type=int, default=16)
+    status_cmd = commands.add_parser("status", help="count queued, sent and failed messages")
+    status_cmd.add_argument("--outbox", default=DEFAULT_OUTBOX)
+    args = parser.parse_args(argv)
+
+    if args.command == "bench":
+        result = benchmark(args.messages, args.attachment_kb)
+        print(f"📧 {args.messages} reports, {args.attachment_kb} KB attachment each")
+        print(f"   connection per message: {result['connection_per_message']:8.0f} msg/s")
+        print(f"   pooled queue:           {result['pooled_queue']:8.0f} msg/s "
+              f"over {result['connections']} connection(s)")
+        print(f"   enqueue (caller cost):  {result['enqueue_only']:8.0f} msg/s")
+    else:
+        outbox = Outbox(args.outbox)
+        print(outbox.counts())
+        for id, error in outbox.failures():
+            print(f"❌ {id}: {error}")
+        outbox.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Per-stage latency instrumentation for the scraping pipeline.
+
+Timings are recorded per stage, and per symbol where one applies, into
+HDR-style histograms: log-linear buckets that keep every value to within
+about 1% at any magnitude, so p50/p95/p99 stay accurate from microsecond
+parses to multi-second downloads without storing the samples.
+
+Stages recorded by the pipeline:
+    dns, connect (TCP + TLS)   aiohttp trace hooks in QuoteFetcher
+    download                   request sent until the body is read
+                               (includes dns and connect on a new connection)
+    parse                      the extractor (scraper_extract.py)
+    store                      QuoteStore.append
+    dataframe, to_excel        building and writing the Excel report
+    smtp                       SMTPDelivery, per message
+
+With ``profile=True`` synchronous stages also run under cProfile, and
+dump_profile() writes the profile of the stage with the most total time
+(network stages spend theirs waiting, so they are not profiled). Only one
+profiler can be active in a process (from Python 3.12 cProfile is built
+on the process-wide sys.monitoring), so a block that starts while another
+thread is being profiled is timed but not profiled.
+"""
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+import aiohttp
+
+_profiling = threading.Lock()  # held while any profiler in the process is enabled
+
+
+class LatencyHistogram:
+    """HDR-style histogram of durations, stored as integer microseconds.
+
+    Values below ``2 * 10**digits`` us are exact; above that, each power of
+    two is split into equal sub-buckets, bounding the relative error.
+    """
+
+    def __init__(self, digits=2):
+        self.sub_bits = (2 * 10 ** digits).bit_length()
+        self.sub_count = 1 << self.sub_bits
+        self.half = self.sub_count >> 1
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self._lock = threading.Lock()
+
+    def _index(self, value):
+        if value < self.sub_count:
+            return value
+        shift = value.bit_length() - self.sub_bits
+        return self.sub_count + (shift - 1) * self.half + (value >> shift) - self.half
+
+    def _value(self, index):
+        """The highest value that maps to ``index``."""
+        if index < self.sub_count:
+            return index
+        shift, offset = divmod(index - self.sub_count, self.half)
+        shift += 1
+        return ((offset + self.half + 1) << shift) - 1
+
+    def record(self, seconds):
+        value = max(0, int(seconds * 1e6))
+        index = self._index(value)
+        with self._lock:
+            self.counts[index] = self.counts.get(index, 0) + 1
+            self.count += 1
+            self.total += value
+            self.max = max(self.max, value)
+            self.min = value if self.min is None else min(self.min, value)
+
+    def percentile(self, p):
+        """The ``p``-th percentile in seconds (0 when empty)."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = max(1, -(-self.count * p // 100))  # ceil
+            seen = 0
+            for index in sorted(self.counts):
+                seen += self.counts[index]
+                if seen >= rank:
+                    return min(self._value(index), self.max) / 1e6
+        return self.max / 1e6
+
+    def summary(self):
+        """count, total, mean, min, p50, p95, p99 and max, in seconds."""
+        return {"count": self.count, "total": self.total / 1e6,
+                "mean": self.total / self.count / 1e6 if self.count else 0.0,
+                "min": (self.min or 0) / 1e6, "p50": self.percentile(50),
+                "p95": self.percentile(95), "p99": self.percentile(99), "max": self.max / 1e6}
+
+
+class Metrics:
+    """Histograms per stage and per (stage, symbol), plus optional profiles."""
+
+    def __init__(self, profile=False):
+        self.profile = profile
+        self.stages = {}
+        self.symbols = {}
+        self._profiles = {}  # stage -> Profile
+        self._lock = threading.Lock()
+
+    def _histogram(self, table, key):
+        with self._lock:
+            if key not in table:
+                table[key] = LatencyHistogram()
+            return table[key]
+
+    def record(self, stage, seconds, symbol=None):
+        self._histogram(self.stages, stage).record(seconds)
+        if symbol is not None:
+            self._histogram(self.symbols, (stage, symbol)).record(seconds)
+
+    @contextmanager
+    def timed(self, stage, symbol=None):
+        """Times a synchronous block (profiling it too when enabled)."""
+        profiler = None
+        if self.profile and _profiling.acquire(blocking=False):  # also skips nested blocks
+            with self._lock:
+                profiler = self._profiles.setdefault(stage, cProfile.Profile())
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                _profiling.release()
+            self.record(stage, elapsed, symbol)
+
+    def trace_config(self):
+        """aiohttp hooks recording the dns and connect stages.
+
+        Requests carry their symbol in ``trace_request_ctx={"symbol": ...}``.
+        """
+        def symbol(context):
+            return (context.trace_request_ctx or {}).get("symbol")
+
+        # Connection creation resolves the host inside it, so each stage keeps
+        # its own start time; connect is then reported without the dns part.
+        def start(stage):
+            async def begin(session, context, params):
+                setattr(context, f"{stage}_started", time.perf_counter())
+            return begin
+
+        async def dns_end(session, context, params):
+            context.dns_time = time.perf_counter() - context.dns_started
+            self.record("dns", context.dns_time, symbol(context))
+
+        async def connect_end(session, context, params):
+            elapsed = time.perf_counter() - context.connect_started
+            self.record("connect", elapsed - getattr(context, "dns_time", 0.0), symbol(context))
+            context.dns_time = 0.0
+
+        config = aiohttp.TraceConfig()
+        config.on_dns_resolvehost_start.append(start("dns"))
+        config.on_dns_resolvehost_end.append(dns_end)
+        config.on_connection_create_start.append(start("connect"))
+        config.on_connection_create_end.append(connect_end)
+        return config
+
+    # --- Reports ---
+    def summary(self):
+        """{"stages": {stage: summary}, "symbols": {symbol: {stage: summary}}}."""
+        symbols = {}
+        for (stage, symbol), histogram in sorted(self.symbols.items()):
+            symbols.setdefault(symbol, {})[stage] = histogram.summary()
+        return {"stages": {stage: h.summary() for stage, h in self.stages.items()},
+                "symbols": symbols}
+
+    def report(self, per_symbol=False):
+        """A p50/p95/p99 table in milliseconds."""
+        lines = [f"{'stage':<22}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}{'total':>10}"]
+
+        def row(name, s):
+            lines.append(f"{name:<22}{s['count']:>7}" + "".join(
+                f"{s[key] * 1000:>10.2f}" for key in ("p50", "p95", "p99", "max", "total")))
+
+        summary = self.summary()
+        for stage, s in summary["stages"].items():
+            row(stage, s)
+        if per_symbol:
+            for symbol, stages in summary["symbols"].items():
+                for stage, s in stages.items():
+                    row(f"{symbol} {stage}", s)
+        return "\n".join(lines) + "\n(times in ms)"
+
+    def export_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def hottest_profiled_stage(self):
+        profiled = set(self._profiles)
+        totals = {stage: h.total for stage, h in self.stages.items() if stage in profiled}
+        return max(totals, key=totals.get) if totals else None
+
+    def dump_profile(self, path, top=15):
+        """Writes the cProfile of the hottest profiled stage to ``path``.
+
+        Returns (stage, printable top-``top`` listing), or None if nothing was profiled.
+        """
+        stage = self.hottest_profiled_stage()
+        if stage is None:
+            return None
+        stats = pstats.Stats(self._profiles[stage], stream=io.StringIO())
+        stats.dump_stats(path)
+        stats.stream = io.StringIO()
+        stats.sort_stats("cumulative").print_stats(top)
+        return stage, stats.stream.getvalue()
@@ -0,0 +1,167 @@
+"""Append-only SQLite history of scraped quotes.
+
+Every scrape is appended to one ``quotes`` table with typed columns (the
+price and percentage change are stored as numbers, not page text) and an
+index on (symbol, time), so the history of one symbol over any period is a
+single index range scan. Excel reports are exported from the store on
+demand instead of being the only record of a run.
+
+Usage:
+    python scraper_store.py query TCS.NS --since 2026-10-01 --until 2026-10-18
+    python scraper_store.py export report.xlsx --since 2026-10-18
+"""
+import argparse
+import re
+import sqlite3
+import time
+from collections import namedtuple
+from datetime import datetime
+
+DEFAULT_PATH = "quotes.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    ts INTEGER NOT NULL,        -- unix time of the scrape, in seconds
+    symbol TEXT NOT NULL,
+    company TEXT NOT NULL,
+    price REAL,
+    change_pct REAL
+);
+CREATE INDEX IF NOT EXISTS quotes_symbol_ts ON quotes (symbol, ts);
+CREATE INDEX IF NOT EXISTS quotes_ts ON quotes (ts);
+"""
+
+COLUMNS = ("Time", "Company", "Symbol", "Price (INR)", "Change (%)")
+
+# The rows one append() stored: its timestamp and the rowid range it took
+Run = namedtuple("Run", "ts first last")
+
+_NUMBER = re.compile(r"[-+]?\d+(?:\.\d+)?")
+
+
+def parse_number(text):
+    """Parses page text such as "3,456.70" or "(+1.23%)"; None if there is no number."""
+    match = _NUMBER.search(str(text).replace(",", ""))
+    return float(match.group()) if match else None
+
+
+def to_timestamp(value, end=False):
+    """Accepts unix seconds, a datetime or an ISO date/time string (local time).
+
+    With ``end``, a bare date means the end of that day.
+    """
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        whole_day = len(value) == 10
+        value = datetime.fromisoformat(value)
+        if end and whole_day:
+            return int(value.timestamp()) + 86399
+    return int(value.timestamp())
+
+
+def _bounds(since, until):
+    since, until = to_timestamp(since), to_timestamp(until, end=True)
+    return (0 if since is None else since), (2**62 if until is None else until)
+
+
+class QuoteStore:
+    """Appends quote rows and answers per-symbol time range queries."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")  # readers never block the scraper
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, rows, ts=None):
+        """Appends scraped rows (WebScraper.py's dicts) in one transaction.
+
+        Returns a Run, which selects exactly these rows in rows() and frame()
+        even when other writers (e.g. scraper_daemon.py) append at the same time.
+        """
+        ts = int(time.time()) if ts is None else to_timestamp(ts)
+        values = [(ts, row["Symbol"], row["Company"], parse_number(row["Price (INR)"]),
+                   parse_number(row["Change (%)"])) for row in rows]
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO quotes (ts, symbol, company, price, change_pct) VALUES (?, ?, ?, ?, ?)",
+                values)
+            # The transaction holds the write lock, so the new rowids are consecutive
+            last = self.db.execute("SELECT COALESCE(MAX(rowid), 0) FROM quotes").fetchone()[0]
+        return Run(ts, last - len(values) + 1, last)
+
+    def history(self, symbol, since=None, until=None):
+        """Returns [(ts, price, change_pct)] for one symbol, oldest first; bounds are inclusive."""
+        return self.db.execute(
+            "SELECT ts, price, change_pct FROM quotes WHERE symbol = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+            (symbol, *_bounds(since, until))).fetchall()
+
+    def rows(self, since=None, until=None, symbols=None, run=None):
+        """Returns every stored row in a time range as (ts, company, symbol, price, change_pct).
+
+        With ``run`` (from append()), only the rows of that run.
+        """
+        query = "SELECT ts, company, symbol, price, change_pct FROM quotes WHERE ts BETWEEN ? AND ?"
+        params = list(_bounds(since, until))
+        if run is not None:
+            query += " AND rowid BETWEEN ? AND ?"
+            params += [run.first, run.last]
+        if symbols:
+            query += f" AND symbol IN ({', '.join('?' * len(symbols))})"
+            params += list(symbols)
+        return self.db.execute(query + " ORDER BY ts, rowid", params).fetchall()
+
+    def frame(self, since=None, until=None, symbols=None, run=None):
+        """The rows of a time range (or run) as a DataFrame with the report's column names."""
+        import pandas as pd
+
+        df = pd.DataFrame(self.rows(since, until, symbols, run), columns=COLUMNS)
+        df["Time"] = pd.to_datetime(df["Time"].map(datetime.fromtimestamp))
+        return df
+
+    def export_excel(self, filename, since=None, until=None, symbols=None):
+        """Writes the rows of a time range to an Excel report; returns the row count."""
+        df = self.frame(since, until, symbols)
+        df.to_excel(filename, index=False)
+        return len(df)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the scraped quote history.")
+    parser.add_argument("--db", default=DEFAULT_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    query_cmd = commands.add_parser("query", help="print one symbol's history")
+    query_cmd.add_argument("symbol")
+
+    export_cmd = commands.add_parser("export", help="write an Excel report")
+    export_cmd.add_argument("filename")
+    export_cmd.add_argument("--symbols", nargs="+")
+
+    for command in (query_cmd, export_cmd):
+        command.add_argument("--since", help="ISO date/time (inclusive)")
+        command.add_argument("--until", help="ISO date/time (inclusive)")
+
+    args = parser.parse_args(argv)
+    with QuoteStore(args.db) as store:
+        if args.command == "query":
+            for ts, price, change in store.history(args.symbol, args.since, args.until):
+                change = "-" if change is None else f"{change:+.2f}%"
+                print(f"{datetime.fromtimestamp(ts):%Y-%m-%d %H:%M:%S}  {price!s:>10}  {change}")
+        else:
+            count = store.export_excel(args.filename, args.since, args.until, args.symbols)
+            print(f"📊 Exported {count} rows to {args.filename}")
+
+
+if __name__ == "__main__":
+    main()